@@ -8,6 +8,7 @@ Designed for Microsoft Copilot Studio integration.
 import os
 import json
 import inspect
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Query, Body, Header, Depends
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, create_model
@@ -24,10 +25,20 @@ from word_document_server.tools import (
 
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release the Azure Blob Storage connections on shutdown."""
+    yield
+    from word_document_server.utils.azure_storage import close_storage
+    await close_storage()
+
+
 app = FastAPI(
     title="Word Document Proposal Generator",
     description="Create commercial proposals from templates - Microsoft Copilot Studio integration",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan
 )
 
 def shorten_response(response: str) -> str:
@@ -99,15 +110,34 @@ TOOL_MODULES = {
 }
 
 
+def _build_tool_table() -> Dict[str, Any]:
+    """Map every public function of the tool modules to its name, first module wins."""
+    tools = {}
+    for module in TOOL_MODULES.values():
+        # Accept both sync and async functions
+        for name, func in inspect.getmembers(module, inspect.isfunction):
+            if not name.startswith('_'):
+                tools.setdefault(name, func)
+    return tools
+
+
+# Tool functions by name, built once instead of scanning the modules per request
+TOOL_FUNCTIONS = _build_tool_table()
+
+# Dispatch details read from each tool's definition once, not per request
+ASYNC_TOOLS = frozenset(name for name, func in TOOL_FUNCTIONS.items() if inspect.iscoroutinefunction(func))
+NO_ARGUMENT_TOOLS = frozenset(
+    name for name, func in TOOL_FUNCTIONS.items()
+    if all(p.default != inspect.Parameter.empty for p in inspect.signature(func).parameters.values())
+)
+
+# Number of tools callable through the connector, reported by the root endpoint
+TOOL_COUNT = len(TOOL_FUNCTIONS)
+
+
 def find_tool_function(func_name: str):
     """Find a tool function by name across all modules."""
-    # Search in tool modules
-    for module_name, module in TOOL_MODULES.items():
-        if hasattr(module, func_name):
-            func = getattr(module, func_name)
-            # Accept both sync and async functions
-            return func
-    return None
+    return TOOL_FUNCTIONS.get(func_name)
 
 
 # Special wrapper endpoints (MUST BE BEFORE catch-all routes)
@@ -147,7 +177,7 @@ async def handle_post(path: str, body: Dict[Any, Any] = Body(...), auth: bool =
 
     try:
         # Call the function with body parameters (async or sync)
-        if inspect.iscoroutinefunction(func):
+        if func_name in ASYNC_TOOLS:
             result = await func(**body)
         else:
             result = func(**body)
@@ -170,14 +200,11 @@ async def handle_get(path: str, auth: bool = Depends(validate_api_key)):
         raise HTTPException(status_code=404, detail=f"Tool not found: {func_name}")
 
     try:
-        # Get function signature to extract parameters
-        sig = inspect.signature(func)
-
         # For GET requests, parameters usually have defaults or are optional
         # Try calling with no parameters first
-        if all(p.default != inspect.Parameter.empty for p in sig.parameters.values()):
+        if func_name in NO_ARGUMENT_TOOLS:
             # Call function (async or sync)
-            if inspect.iscoroutinefunction(func):
+            if func_name in ASYNC_TOOLS:
                 result = await func()
             else:
                 result = func()
@@ -196,19 +223,12 @@ async def handle_get(path: str, auth: bool = Depends(validate_api_key)):
 @app.get("/")
 async def root():
     """Root endpoint - connector info."""
-    # Count available tools
-    tool_count = sum(
-        1 for module in TOOL_MODULES.values()
-        for name, func in inspect.getmembers(module, inspect.isfunction)
-        if inspect.iscoroutinefunction(func) and not name.startswith('_')
-    )
-
     return {
         "name": "Word Document Proposal Generator",
         "version": "1.0",
-        "description": f"REST API for proposal generation - {tool_count} tools",
+        "description": f"REST API for proposal generation - {TOOL_COUNT} tools",
         "swagger": "/openapi.json",
-        "tools_available": tool_count
+        "tools_available": TOOL_COUNT
     }
 
 
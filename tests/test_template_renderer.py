@@ -0,0 +1,232 @@
+"""
+Tests for the variable matching and rendering of the template renderer.
+"""
+import io
+import os
+import re
+import random
+import zipfile
+import unittest
+import importlib.util
+
+from docx import Document
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# template_renderer has no package-internal imports; loading it from its file
+# keeps the test independent of word_document_server.utils.__init__
+_RENDERER_PATH = os.path.join(os.path.dirname(__file__), '..', 'word_document_server', 'utils',
+                              'template_renderer.py')
+_spec = importlib.util.spec_from_file_location('template_renderer', _RENDERER_PATH)
+template_renderer = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(template_renderer)
+
+
+def _regex_pattern(var_names):
+    """The longest-first alternation the automaton stands in for."""
+    return re.compile("|".join(re.escape(var_name) for var_name in sorted(var_names, key=len, reverse=True)))
+
+
+@unittest.skipIf(ahocorasick is None, "pyahocorasick is not installed")
+class AutomatonPatternTest(unittest.TestCase):
+    """AutomatonPattern must find exactly the matches of the regex alternation."""
+
+    def assert_same_matches(self, var_names, text):
+        regex = _regex_pattern(var_names)
+        automaton = template_renderer.AutomatonPattern(frozenset(var_names))
+        repl = lambda match: f"<{match.group(0)}>"
+
+        self.assertEqual([m.span() for m in automaton.finditer(text)],
+                         [m.span() for m in regex.finditer(text)], (var_names, text))
+        self.assertEqual(automaton.findall(text), regex.findall(text), (var_names, text))
+        self.assertEqual(automaton.subn(repl, text), regex.subn(repl, text), (var_names, text))
+        regex_match = regex.search(text)
+        automaton_match = automaton.search(text)
+        self.assertEqual(automaton_match and automaton_match.span(), regex_match and regex_match.span(),
+                         (var_names, text))
+
+    def test_partial_longer_name_keeps_shorter_match(self):
+        self.assert_same_matches({'a', 'baa'}, 'ba')
+        self.assert_same_matches({'a', 'baa'}, 'aba')
+
+    def test_random_names_match_regex(self):
+        rng = random.Random(0)
+        for _ in range(5000):
+            var_names = {''.join(rng.choice('ab') for _ in range(rng.randint(1, 4)))
+                         for _ in range(rng.randint(1, 6))}
+            text = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 16)))
+            self.assert_same_matches(var_names, text)
+
+    def test_placeholder_names_match_regex(self):
+        rng = random.Random(1)
+        var_names = {f"{{{{var{i}}}}}" for i in range(template_renderer.AUTOMATON_MIN_VARIABLES)}
+        var_names |= {f"{{{{var{i}_x}}}}" for i in range(8)}
+        pool = sorted(var_names) + ['{{var', '}}', ' text ', 'x']
+        for _ in range(500):
+            text = ''.join(rng.choice(pool) for _ in range(rng.randint(0, 12)))
+            self.assert_same_matches(var_names, text)
+
+
+def _make_template(build) -> bytes:
+    """Build a small .docx in memory; build(document) adds the content."""
+    document = Document()
+    build(document)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _read_part(package, name: str = 'word/document.xml') -> bytes:
+    """Raw bytes of one entry of a rendered package."""
+    with zipfile.ZipFile(package) as zf:
+        return zf.read(name)
+
+
+def _paragraph_texts(package) -> list:
+    """Text of the body paragraphs of a rendered package, as Word shows it."""
+    package.seek(0)
+    return [paragraph.text for paragraph in Document(package).paragraphs]
+
+
+class TemplateSkeletonRenderTest(unittest.TestCase):
+    """TemplateSkeleton.render must substitute variables wherever Word puts them."""
+
+    def render(self, template_data, variables, fast=False):
+        pattern = template_renderer.compile_variables_pattern(frozenset(variables))
+        return template_renderer.TemplateSkeleton(template_data).render(pattern, variables, fast=fast)
+
+    def test_placeholder_in_one_run(self):
+        template = _make_template(lambda document: document.add_paragraph("Dear {{name}},"))
+        rendered = self.render(template, {'{{name}}': 'Ada'})
+        self.assertEqual(_paragraph_texts(rendered), ["Dear Ada,"])
+
+    def test_placeholder_split_across_runs(self):
+        def build(document):
+            paragraph = document.add_paragraph("Dear {{na")
+            paragraph.add_run("me}} and {{")
+            paragraph.add_run("other}}!")
+        template = _make_template(build)
+        rendered = self.render(template, {'{{name}}': 'Ada', '{{other}}': 'Bob'})
+        self.assertEqual(_paragraph_texts(rendered), ["Dear Ada and Bob!"])
+
+    def test_multi_line_value(self):
+        template = _make_template(lambda document: document.add_paragraph("Address: {{address}}"))
+        rendered = self.render(template, {'{{address}}': '1 Main St\nSpringfield\tUSA'})
+        self.assertEqual(_paragraph_texts(rendered), ["Address: 1 Main St\nSpringfield\tUSA"])
+        xml = _read_part(rendered)
+        self.assertIn(b'<w:br/>', xml)
+        self.assertIn(b'<w:tab/>', xml)
+
+    def test_value_is_xml_escaped(self):
+        template = _make_template(lambda document: document.add_paragraph("Client: {{client}}"))
+        for fast in (False, True):
+            rendered = self.render(template, {'{{client}}': '<Smith & Sons>'}, fast=fast)
+            self.assertEqual(_paragraph_texts(rendered), ["Client: <Smith & Sons>"])
+            self.assertIn(b'Client: &lt;Smith &amp; Sons&gt;', _read_part(rendered))
+
+    def test_headers_and_footers(self):
+        def build(document):
+            section = document.sections[0]
+            section.header.paragraphs[0].text = "Header for {{client}}"
+            section.footer.paragraphs[0].text = "Footer for {{client}}"
+            document.add_paragraph("Body for {{client}}")
+        template = _make_template(build)
+        rendered = self.render(template, {'{{client}}': 'ACME'})
+        rendered_document = Document(rendered)
+        section = rendered_document.sections[0]
+        self.assertEqual(section.header.paragraphs[0].text, "Header for ACME")
+        self.assertEqual(section.footer.paragraphs[0].text, "Footer for ACME")
+        self.assertEqual([paragraph.text for paragraph in rendered_document.paragraphs], ["Body for ACME"])
+
+    def test_parts_without_variables_are_copied_as_is(self):
+        template = _make_template(lambda document: document.add_paragraph("Dear {{name}},"))
+        rendered = self.render(template, {'{{name}}': 'Ada'})
+        with zipfile.ZipFile(io.BytesIO(template)) as source, zipfile.ZipFile(rendered) as result:
+            self.assertEqual(result.namelist(), source.namelist())
+            for name in source.namelist():
+                if name != 'word/document.xml':
+                    self.assertEqual(result.read(name), source.read(name), name)
+
+    def test_fast_path_matches_tree_render(self):
+        def build(document):
+            document.add_paragraph("{{a}} then {{b}}")
+            document.add_paragraph("{{b}} again")
+        template = _make_template(build)
+        variables = {'{{a}}': 'first', '{{b}}': 'second'}
+        self.assertEqual(_paragraph_texts(self.render(template, variables, fast=True)),
+                         _paragraph_texts(self.render(template, variables, fast=False)))
+        self.assertEqual(_paragraph_texts(self.render(template, variables, fast=True)),
+                         ["first then second", "second again"])
+
+    def test_fast_path_falls_back_for_split_placeholder(self):
+        def build(document):
+            paragraph = document.add_paragraph("Dear {{na")
+            paragraph.add_run("me}}")
+        template = _make_template(build)
+        rendered = self.render(template, {'{{name}}': 'Ada'}, fast=True)
+        self.assertEqual(_paragraph_texts(rendered), ["Dear Ada"])
+
+    def test_fast_path_falls_back_for_multi_line_value(self):
+        template = _make_template(lambda document: document.add_paragraph("{{lines}}"))
+        rendered = self.render(template, {'{{lines}}': 'one\ntwo'}, fast=True)
+        self.assertEqual(_paragraph_texts(rendered), ["one\ntwo"])
+
+
+class ReplaceInXmlTest(unittest.TestCase):
+    """_replace_in_xml must only succeed when every name sits whole in the XML."""
+
+    def setUp(self):
+        self.variables = {'{{name}}': 'Ada'}
+        self.pattern = template_renderer.compile_variables_pattern(frozenset(self.variables))
+
+    def test_replaces_whole_names(self):
+        data = b'<w:t>Dear {{name}}, {{name}}</w:t>'
+        self.assertEqual(template_renderer._replace_in_xml(data, self.pattern, self.variables, 2),
+                         b'<w:t>Dear Ada, Ada</w:t>')
+
+    def test_count_mismatch_returns_none(self):
+        data = b'<w:t>Dear {{na</w:t><w:t>me}}</w:t>'
+        self.assertIsNone(template_renderer._replace_in_xml(data, self.pattern, self.variables, 1))
+
+    def test_invalid_utf8_returns_none(self):
+        self.assertIsNone(template_renderer._replace_in_xml(b'\xff{{name}}', self.pattern, self.variables, 1))
+
+    def test_values_needing_the_tree_disable_the_fast_path(self):
+        self.assertIsNone(template_renderer._xml_variables({'{{a}}': ' padded'}))
+        self.assertIsNone(template_renderer._xml_variables({'{{a}}': 'two\nlines'}))
+        self.assertEqual(template_renderer._xml_variables({'{{a&b}}': 'x < y'}), {'{{a&amp;b}}': 'x &lt; y'})
+
+
+class ReplacePackagePartsTest(unittest.TestCase):
+    """replace_package_parts must swap the given entries and copy the rest."""
+
+    def test_replaces_only_given_parts(self):
+        template = _make_template(lambda document: document.add_paragraph("original"))
+        document_xml = _read_part(io.BytesIO(template)).replace(b'original', b'replaced')
+        result = template_renderer.replace_package_parts(template, {'word/document.xml': document_xml})
+
+        self.assertEqual(_paragraph_texts(result), ["replaced"])
+        with zipfile.ZipFile(io.BytesIO(template)) as source, zipfile.ZipFile(result) as package:
+            self.assertEqual(package.namelist(), source.namelist())
+            for info in source.infolist():
+                if info.filename != 'word/document.xml':
+                    self.assertEqual(package.read(info.filename), source.read(info), info.filename)
+                    self.assertEqual(package.getinfo(info.filename).compress_type, info.compress_type)
+
+
+class TemplateSkeletonCacheTest(unittest.TestCase):
+    """get_template_skeleton must reuse a parsed template only for identical bytes."""
+
+    def test_reparses_changed_template(self):
+        first = _make_template(lambda document: document.add_paragraph("one {{x}}"))
+        second = _make_template(lambda document: document.add_paragraph("two {{x}}"))
+        skeleton = template_renderer.get_template_skeleton('cache-test', 'tests', first)
+        self.assertIs(template_renderer.get_template_skeleton('cache-test', 'tests', first), skeleton)
+        self.assertIsNot(template_renderer.get_template_skeleton('cache-test', 'tests', second), skeleton)
+
+
+if __name__ == '__main__':
+    unittest.main()
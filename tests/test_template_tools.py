@@ -0,0 +1,52 @@
+"""
+Tests for the table cleaning applied when a document is added as a template.
+"""
+import unittest
+
+from docx import Document
+
+try:
+    from word_document_server.tools.template_tools import _clean_tables
+except ImportError:
+    # The tools need the whole server package and its Azure dependencies
+    _clean_tables = None
+
+
+def _add_table(document, rows):
+    """Add a table filled with rows (lists of cell texts)."""
+    table = document.add_table(rows=len(rows), cols=len(rows[0]))
+    for row, texts in zip(table.rows, rows):
+        for cell, text in zip(row.cells, texts):
+            cell.text = text
+    return table
+
+
+@unittest.skipIf(_clean_tables is None, "word_document_server dependencies are not installed")
+class CleanTablesTest(unittest.TestCase):
+    """_clean_tables must keep the title and header rows of every table only."""
+
+    def test_removes_data_rows(self):
+        document = Document()
+        table = _add_table(document, [["Orders", ""], ["Item", "Qty"], ["Pen", "2"], ["Ink", "5"]])
+        stats = _clean_tables(document)
+
+        self.assertEqual([[cell.text for cell in row.cells] for row in table.rows], [["Orders", ""], ["Item", "Qty"]])
+        self.assertEqual(stats, {"tables_cleaned": 1, "rows_removed": 2, "table_titles": ["Orders"]})
+
+    def test_short_tables_are_left_alone(self):
+        document = Document()
+        _add_table(document, [["Summary", "2024"]])
+        _add_table(document, [["", ""], ["Name", "Role"]])
+        stats = _clean_tables(document)
+
+        self.assertEqual([len(table.rows) for table in document.tables], [1, 2])
+        self.assertEqual(stats, {"tables_cleaned": 0, "rows_removed": 0, "table_titles": ["Summary - 2024", "Tableau 2"]})
+
+    def test_document_without_tables(self):
+        document = Document()
+        document.add_paragraph("No tables here")
+        self.assertEqual(_clean_tables(document), {"tables_cleaned": 0, "rows_removed": 0, "table_titles": []})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,7 +14,7 @@ from docx.shared import Inches, Pt
 from word_document_server.utils.file_utils import check_file_writeable, ensure_docx_extension
 from word_document_server.utils.document_utils import find_and_replace_text, insert_header_near_text, insert_numbered_list_near_text, insert_line_or_paragraph_near_text, replace_paragraph_block_below_header, replace_block_between_manual_anchors
 from word_document_server.core.styles import ensure_heading_style, ensure_table_style
-from word_document_server.utils.azure_storage import get_document_from_storage, save_document_to_storage, get_document_url
+from word_document_server.utils.azure_storage import get_document_stream_from_storage, save_document_to_storage, get_document_url
 from word_document_server.utils.blob_document import load_document_from_blob, save_document_to_blob
 
 
@@ -40,12 +40,13 @@ async def add_heading(filename: str, text: str, level: int = 1) -> str:
 
     try:
         # Get document from Azure Blob Storage
-        success, doc_data, message = get_document_from_storage(filename)
+        success, doc_stream, message = await get_document_stream_from_storage(filename)
         if not success:
             return f"Document {filename} does not exist: {message}"
 
         # Load document from blob data
-        doc = Document(io.BytesIO(doc_data))
+        with doc_stream:
+            doc = Document(doc_stream)
 
         # Ensure heading styles exist
         ensure_heading_style(doc)
@@ -70,15 +71,14 @@ async def add_heading(filename: str, text: str, level: int = 1) -> str:
         # Save document back to blob storage
         doc_buffer = io.BytesIO()
         doc.save(doc_buffer)
-        doc_data = doc_buffer.getvalue()
-        doc_buffer.close()
+        doc_buffer.seek(0)
 
-        success, save_message = save_document_to_storage(filename, doc_data)
+        success, save_message = await save_document_to_storage(filename, doc_buffer)
         if not success:
             return f"Failed to save document: {save_message}"
 
         # Get URL if available
-        url = get_document_url(filename)
+        url = await get_document_url(filename)
         if url:
             return f"Heading '{text}' (level {level}) added to {filename}. URL: {url}"
         else:
@@ -100,12 +100,13 @@ async def add_paragraph(filename: str, text: str, style: Optional[str] = None) -
 
     try:
         # Get document from Azure Blob Storage
-        success, doc_data, message = get_document_from_storage(filename)
+        success, doc_stream, message = await get_document_stream_from_storage(filename)
         if not success:
             return f"Document {filename} does not exist: {message}"
 
         # Load document from blob data
-        doc = Document(io.BytesIO(doc_data))
+        with doc_stream:
+            doc = Document(doc_stream)
         paragraph = doc.add_paragraph(text)
 
         if style:
@@ -118,15 +119,14 @@ async def add_paragraph(filename: str, text: str, style: Optional[str] = None) -
         # Save document back to blob storage
         doc_buffer = io.BytesIO()
         doc.save(doc_buffer)
-        doc_data = doc_buffer.getvalue()
-        doc_buffer.close()
+        doc_buffer.seek(0)
 
-        success, save_message = save_document_to_storage(filename, doc_data)
+        success, save_message = await save_document_to_storage(filename, doc_buffer)
         if not success:
             return f"Failed to save document: {save_message}"
 
         # Get URL if available
-        url = get_document_url(filename)
+        url = await get_document_url(filename)
         if url:
             return f"Paragraph added to {filename}. URL: {url}"
         else:
@@ -194,12 +194,13 @@ async def add_table_row(filename: str, table_index: int, row_data: List[str]) ->
 
     try:
         # Get document from Azure Blob Storage
-        success, doc_data, message = get_document_from_storage(filename)
+        success, doc_stream, message = await get_document_stream_from_storage(filename)
         if not success:
             return f"Document {filename} does not exist: {message}"
 
         # Load document from blob data
-        doc = Document(io.BytesIO(doc_data))
+        with doc_stream:
+            doc = Document(doc_stream)
 
         # Validate table index
         if table_index < 0 or table_index >= len(doc.tables):
@@ -218,15 +219,14 @@ async def add_table_row(filename: str, table_index: int, row_data: List[str]) ->
         # Save document back to blob storage
         doc_buffer = io.BytesIO()
         doc.save(doc_buffer)
-        doc_data = doc_buffer.getvalue()
-        doc_buffer.close()
+        doc_buffer.seek(0)
 
-        success, save_message = save_document_to_storage(filename, doc_data)
+        success, save_message = await save_document_to_storage(filename, doc_buffer)
         if not success:
             return f"Failed to save document: {save_message}"
 
         # Get URL if available
-        url = get_document_url(filename)
+        url = await get_document_url(filename)
         if url:
             return f"Row added to table {table_index} in {filename}. URL: {url}"
         else:
@@ -457,12 +457,13 @@ async def search_and_replace(filename: str, find_text: str, replace_text: str) -
 
     try:
         # Get document from Azure Blob Storage
-        success, doc_data, message = get_document_from_storage(filename)
+        success, doc_stream, message = await get_document_stream_from_storage(filename)
         if not success:
             return f"Document {filename} does not exist: {message}"
 
         # Load document from blob data
-        doc = Document(io.BytesIO(doc_data))
+        with doc_stream:
+            doc = Document(doc_stream)
 
         # Perform find and replace
         count = find_and_replace_text(doc, find_text, replace_text)
@@ -471,15 +472,14 @@ async def search_and_replace(filename: str, find_text: str, replace_text: str) -
             # Save document back to blob storage
             doc_buffer = io.BytesIO()
             doc.save(doc_buffer)
-            doc_data = doc_buffer.getvalue()
-            doc_buffer.close()
+            doc_buffer.seek(0)
 
-            success, save_message = save_document_to_storage(filename, doc_data)
+            success, save_message = await save_document_to_storage(filename, doc_buffer)
             if not success:
                 return f"Failed to save document: {save_message}"
 
             # Get URL if available
-            url = get_document_url(filename)
+            url = await get_document_url(filename)
             if url:
                 return f"Replaced {count} occurrence(s) of '{find_text}' with '{replace_text}'. URL: {url}"
             else:
@@ -39,15 +39,14 @@ async def create_document(filename: str, title: Optional[str] = None, author: Op
         # Save to memory buffer first
         doc_buffer = io.BytesIO()
         doc.save(doc_buffer)
-        doc_data = doc_buffer.getvalue()
-        doc_buffer.close()
+        doc_buffer.seek(0)
 
         # Save to Azure Blob Storage (or local as fallback)
-        success, message = save_document_to_storage(filename, doc_data)
+        success, message = await save_document_to_storage(filename, doc_buffer)
 
         if success:
             # Try to get the public URL if available
-            url = get_document_url(filename)
+            url = await get_document_url(filename)
             if url:
                 return f"Document {filename} created successfully. Access URL: {url}"
             else:
@@ -69,7 +68,7 @@ async def get_document_info(filename: str) -> str:
 
     try:
         # Try to get from storage first
-        success, doc_data, message = get_document_from_storage(filename)
+        success, doc_data, message = await get_document_from_storage(filename)
 
         if not success:
             return f"Document {filename} does not exist: {message}"
@@ -84,7 +83,7 @@ async def get_document_info(filename: str) -> str:
             properties = get_document_properties(temp_path)
 
             # Add URL if available
-            url = get_document_url(filename)
+            url = await get_document_url(filename)
             if url:
                 properties['download_url'] = url
 
@@ -119,16 +118,25 @@ async def get_document_outline(filename: str) -> str:
     return json.dumps(structure, indent=2)
 
 
-async def list_available_documents(directory: str = ".") -> str:
+async def list_available_documents(directory: str = ".", page_token: str = "", page_size: int = 0) -> str:
     """List all .docx files in storage.
 
     Args:
         directory: Directory to search for Word documents (ignored for Azure storage)
+        page_token: Token returned with the previous page, to list the next one
+        page_size: Number of documents per page; 0 lists every document unless a page_token is given
     """
     try:
-        from word_document_server.utils.azure_storage import list_stored_documents
-
-        success, file_list, message = list_stored_documents()
+        from word_document_server.utils.azure_storage import list_stored_documents, list_stored_documents_page, get_blob_url
+
+        next_page_token = None
+        if page_token or page_size > 0:
+            page_kwargs = {'page_size': page_size} if page_size > 0 else {}
+            success, file_list, next_page_token, message = await list_stored_documents_page(
+                page_token or None, **page_kwargs
+            )
+        else:
+            success, file_list, message = await list_stored_documents()
 
         if not success:
             return f"Failed to list documents: {message}"
@@ -140,12 +148,15 @@ async def list_available_documents(directory: str = ".") -> str:
         for file_info in file_list:
             status = " (EXPIRED)" if file_info.get('expired', False) else ""
             size_kb = file_info.get('size', 0) / 1024
-            url = get_document_url(file_info['name'])
+            url = get_blob_url(file_info['blob_name'])
             url_info = f"\n  URL: {url}" if url else ""
             result += f"- {file_info['name']} ({size_kb:.2f} KB){status}\n"
             result += f"  Created: {file_info.get('created', 'Unknown')}\n"
             result += f"  Expires: {file_info.get('expires', 'No expiry')}{url_info}\n"
 
+        if next_page_token:
+            result += f"More documents available. Next page token: {next_page_token}\n"
+
         return result
     except Exception as e:
         return f"Failed to list documents: {str(e)}"
@@ -254,12 +265,13 @@ async def get_document_xml_tool(filename: str) -> str:
 async def cleanup_expired_documents() -> str:
     """Clean up expired documents from storage."""
     try:
-        from word_document_server.utils.azure_storage import cleanup_expired_documents
+        from word_document_server.utils.azure_storage import list_and_cleanup_documents
 
-        success, count, message = cleanup_expired_documents()
+        # One listing pass both deletes the expired documents and counts the live ones
+        success, file_list, count, message = await list_and_cleanup_documents()
 
         if success:
-            return f"Cleanup completed: {message}"
+            return f"Cleanup completed: cleaned up {count} expired files, {len(file_list)} documents remaining"
         else:
             return f"Cleanup failed: {message}"
 
@@ -272,7 +284,7 @@ async def download_document(filename: str) -> str:
     filename = ensure_docx_extension(filename)
 
     try:
-        url = get_document_url(filename)
+        url = await get_document_url(filename, verify_exists=True)
         if url:
             return f"Download URL for {filename}: {url}"
         else:
@@ -286,7 +298,7 @@ async def debug_storage() -> str:
     """Debug storage configuration and available documents."""
     try:
         from word_document_server.utils.azure_storage import debug_storage_state
-        return debug_storage_state()
+        return await debug_storage_state()
     except Exception as e:
         return f"Failed to debug storage: {str(e)}"
 
@@ -297,7 +309,7 @@ async def check_document_exists(filename: str) -> str:
 
     try:
         # Try to get the document
-        success, doc_data, message = get_document_from_storage(filename)
+        success, doc_data, message = await get_document_from_storage(filename)
 
         result = []
         result.append(f"Document check for: {filename}")
@@ -331,23 +343,22 @@ async def delete_document(filename: str) -> str:
     filename = ensure_docx_extension(filename)
 
     try:
-        from word_document_server.utils.azure_storage import storage
+        from word_document_server.utils.azure_storage import get_storage
+        storage = get_storage()
 
         if not storage.is_enabled():
             return "Azure Blob Storage is not configured. Cannot delete document."
 
-        # Get blob client
-        blob_client = storage.blob_service_client.get_blob_client(
-            container=storage.container_name,
-            blob=filename
-        )
-
-        # Check if document exists
-        if not blob_client.exists():
+        # Check if document exists, under its normalized name or as given
+        for name in dict.fromkeys((storage.blob_name(filename), filename)):
+            blob_client = storage.container_client.get_blob_client(name)
+            if await blob_client.exists():
+                break
+        else:
             return f"Document '{filename}' not found in storage"
 
         # Delete the document
-        blob_client.delete_blob()
+        await blob_client.delete_blob()
 
         return f"Document '{filename}' deleted successfully"
 
@@ -21,7 +21,7 @@ from word_document_server.core.tables import (
     set_column_widths, set_table_width as set_table_width_func, auto_fit_table,
     format_cell_text_by_position, set_cell_padding_by_position
 )
-from word_document_server.utils.azure_storage import get_document_from_storage, save_document_to_storage, get_document_url
+from word_document_server.utils.azure_storage import get_document_stream_from_storage, save_document_to_storage, get_document_url
 
 
 async def format_text(filename: str, paragraph_index: int, start_pos: int, end_pos: int, 
@@ -208,12 +208,13 @@ async def format_table(filename: str, table_index: int,
 
     try:
         # Get document from Azure Blob Storage
-        success, doc_data, message = get_document_from_storage(filename)
+        success, doc_stream, message = await get_document_stream_from_storage(filename)
         if not success:
             return f"Document {filename} does not exist: {message}"
 
         # Load document from blob data
-        doc = Document(io.BytesIO(doc_data))
+        with doc_stream:
+            doc = Document(doc_stream)
 
         # Validate table index
         if table_index < 0 or table_index >= len(doc.tables):
@@ -228,14 +229,13 @@ async def format_table(filename: str, table_index: int,
             # Save document back to blob storage
             doc_buffer = io.BytesIO()
             doc.save(doc_buffer)
-            doc_data = doc_buffer.getvalue()
-            doc_buffer.close()
+            doc_buffer.seek(0)
 
-            success, save_message = save_document_to_storage(filename, doc_data)
+            success, save_message = await save_document_to_storage(filename, doc_buffer)
             if not success:
                 return f"Failed to save document: {save_message}"
 
-            url = get_document_url(filename)
+            url = await get_document_url(filename)
             if url:
                 return f"Table at index {table_index} formatted successfully. URL: {url}"
             else:
@@ -324,12 +324,13 @@ async def apply_table_alternating_rows(filename: str, table_index: int,
 
     try:
         # Get document from Azure Blob Storage
-        success, doc_data, message = get_document_from_storage(filename)
+        success, doc_stream, message = await get_document_stream_from_storage(filename)
         if not success:
             return f"Document {filename} does not exist: {message}"
 
         # Load document from blob data
-        doc = Document(io.BytesIO(doc_data))
+        with doc_stream:
+            doc = Document(doc_stream)
 
         # Validate table index
         if table_index < 0 or table_index >= len(doc.tables):
@@ -344,14 +345,13 @@ async def apply_table_alternating_rows(filename: str, table_index: int,
             # Save document back to blob storage
             doc_buffer = io.BytesIO()
             doc.save(doc_buffer)
-            doc_data = doc_buffer.getvalue()
-            doc_buffer.close()
+            doc_buffer.seek(0)
 
-            success, save_message = save_document_to_storage(filename, doc_data)
+            success, save_message = await save_document_to_storage(filename, doc_buffer)
             if not success:
                 return f"Failed to save document: {save_message}"
 
-            url = get_document_url(filename)
+            url = await get_document_url(filename)
             if url:
                 return f"Alternating row shading applied successfully to table {table_index}. URL: {url}"
             else:
@@ -382,12 +382,13 @@ async def highlight_table_header(filename: str, table_index: int,
 
     try:
         # Get document from Azure Blob Storage
-        success, doc_data, message = get_document_from_storage(filename)
+        success, doc_stream, message = await get_document_stream_from_storage(filename)
         if not success:
             return f"Document {filename} does not exist: {message}"
 
         # Load document from blob data
-        doc = Document(io.BytesIO(doc_data))
+        with doc_stream:
+            doc = Document(doc_stream)
 
         # Validate table index
         if table_index < 0 or table_index >= len(doc.tables):
@@ -402,14 +403,13 @@ async def highlight_table_header(filename: str, table_index: int,
             # Save document back to blob storage
             doc_buffer = io.BytesIO()
             doc.save(doc_buffer)
-            doc_data = doc_buffer.getvalue()
-            doc_buffer.close()
+            doc_buffer.seek(0)
 
-            success, save_message = save_document_to_storage(filename, doc_data)
+            success, save_message = await save_document_to_storage(filename, doc_buffer)
             if not success:
                 return f"Failed to save document: {save_message}"
 
-            url = get_document_url(filename)
+            url = await get_document_url(filename)
             if url:
                 return f"Header highlighting applied successfully to table {table_index}. URL: {url}"
             else:
@@ -1005,12 +1005,13 @@ async def format_table_cell_text(filename: str, table_index: int, row_index: int
 
     try:
         # Get document from Azure Blob Storage
-        success, doc_data, message = get_document_from_storage(filename)
+        success, doc_stream, message = await get_document_stream_from_storage(filename)
         if not success:
             return f"Document {filename} does not exist: {message}"
 
         # Load document from blob data
-        doc = Document(io.BytesIO(doc_data))
+        with doc_stream:
+            doc = Document(doc_stream)
 
         # Validate table index
         if table_index < 0 or table_index >= len(doc.tables):
@@ -1033,15 +1034,14 @@ async def format_table_cell_text(filename: str, table_index: int, row_index: int
             # Save document back to blob storage
             doc_buffer = io.BytesIO()
             doc.save(doc_buffer)
-            doc_data = doc_buffer.getvalue()
-            doc_buffer.close()
+            doc_buffer.seek(0)
 
-            success, save_message = save_document_to_storage(filename, doc_data)
+            success, save_message = await save_document_to_storage(filename, doc_buffer)
             if not success:
                 return f"Failed to save document: {save_message}"
 
             # Get URL if available
-            url = get_document_url(filename)
+            url = await get_document_url(filename)
             format_desc = []
             if text_content is not None:
                 format_desc.append(f"content='{text_content[:30]}{'...' if len(text_content) > 30 else ''}'")
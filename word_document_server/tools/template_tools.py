@@ -3,13 +3,157 @@ Template management tools for Word Document Server.
 Provides MCP tools for creating, listing, and using document templates.
 """
 import io
-import json
-from typing import Optional, Dict, Any
-from docx import Document
+import re
+import sys
+import asyncio
+import zipfile
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple, List
+from lxml import etree
 
 from word_document_server.utils.file_utils import ensure_docx_extension
-from word_document_server.utils.template_storage import list_templates, get_template, save_template, get_template_url
+from word_document_server.utils.template_storage import (
+    list_templates, get_template_cached, save_template, update_template_metadata,
+    get_template_location, get_template_url, get_template_urls
+)
 from word_document_server.utils.azure_storage import get_document_from_storage, save_document_to_storage, get_document_url
+from word_document_server.utils.template_renderer import (
+    CONTENT_TYPES_PART, W_NAMESPACE, W_TEXT, compile_variables_pattern, get_template_skeleton,
+    replace_package_parts
+)
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        """Serialize a tool response as indented JSON."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    import json
+
+    def _dumps(obj: Any) -> str:
+        """Serialize a tool response as indented JSON."""
+        return json.dumps(obj, indent=2)
+
+# Template variables in the {{variable_name}} format
+_VAR_RE = re.compile(r'\{\{([^}]+)\}\}')
+
+# All paragraphs below an element, including those nested in tables
+_PARAGRAPHS = etree.XPath('.//w:p', namespaces={'w': W_NAMESPACE})
+
+# Children of a w:p that contribute to its text, as in python-docx's paragraph text
+_PARAGRAPH_CONTENT = etree.XPath('w:r | w:hyperlink', namespaces={'w': W_NAMESPACE})
+
+# Analysis results of get_template_info: (category, template_name) -> (etag, info)
+TEMPLATE_INFO_CACHE_SIZE = 128
+_template_info_cache: "OrderedDict[Tuple[str, str], Tuple[str, Dict[str, Any]]]" = OrderedDict()
+
+
+def _split_template_id(template_name: str, default_category: str) -> Tuple[str, str]:
+    """
+    Split a template identifier into name and category.
+
+    Strips a .docx extension and extracts the category from a "Category/Name"
+    path, e.g. "Eric FER/Proposition 2024.docx" -> ("Proposition 2024", "Eric FER").
+
+    Args:
+        template_name: Template name, optionally with .docx extension and category path
+        default_category: Category to use when template_name has no path
+
+    Returns:
+        Tuple of (template_name, category)
+    """
+    template_name = template_name.removesuffix('.docx')
+    if '/' in template_name:
+        category, template_name = template_name.rsplit('/', 1)
+        return template_name, category
+    return template_name, default_category
+
+
+def _short_text(p, limit: int = 100) -> str:
+    """
+    Get the text of a paragraph element, truncated to limit characters plus "...".
+
+    Runs are read only until the limit is passed, so long paragraphs are never
+    joined in full. Returns an empty string if the paragraph is blank.
+    """
+    pieces = []
+    length = 0
+    has_text = False
+    for element in _PARAGRAPH_CONTENT(p):
+        text = element.text
+        pieces.append(text)
+        length += len(text)
+        has_text = has_text or bool(text.strip())
+        if has_text and length > limit:
+            break
+
+    if not has_text:
+        return ""
+    text = ''.join(pieces)
+    return text[:limit] + "..." if len(text) > limit else text
+
+
+def _text_part_roots(doc):
+    """Yield the document body and the root element of every header and footer part."""
+    from docx.opc.constants import RELATIONSHIP_TYPE as RT
+
+    yield doc.element.body
+    for rel in doc.part.rels.values():
+        if rel.reltype in (RT.HEADER, RT.FOOTER) and not rel.is_external:
+            yield rel.target_part.element
+
+
+async def _find_blob_by_filename(container_client, filename: str) -> Optional[str]:
+    """
+    Find a blob by file name (case insensitive) anywhere in the container.
+
+    Rather than listing the whole container, the folders are enumerated with one
+    hierarchical listing and each folder is then probed in parallel for names
+    starting with the first letter of filename, in either case. Only when that
+    finds nothing (e.g. the file sits in a nested folder) is the whole
+    container listed.
+
+    Args:
+        container_client: Container to search
+        filename: File name to look for
+
+    Returns:
+        Name of the first matching blob in listing order, or None
+    """
+    from azure.storage.blob.aio import BlobPrefix
+
+    target = filename.lower()
+    first_letters = {filename[:1].lower(), filename[:1].upper()}
+
+    def is_match(blob_name: str) -> bool:
+        # Skip placeholder files
+        if blob_name.endswith('/.keep') or blob_name == '.keep':
+            return False
+        return blob_name.split('/')[-1].lower() == target
+
+    async def probe(prefix: str) -> List[str]:
+        return [blob.name async for blob in container_client.list_blobs(name_starts_with=prefix)]
+
+    folders, matches = [], []
+    async for item in container_client.walk_blobs(delimiter='/'):
+        if isinstance(item, BlobPrefix):
+            folders.append(item.name)
+        else:
+            matches.append(item.name)
+
+    probes = await asyncio.gather(*(
+        probe(f"{folder}{letter}")
+        for folder in folders
+        for letter in first_letters
+    ))
+    for blob_names in probes:
+        matches.extend(blob_names)
+
+    matches = [blob_name for blob_name in matches if is_match(blob_name)]
+    if not matches:
+        matches = [blob.name async for blob in container_client.list_blobs() if is_match(blob.name)]
+    return min(matches) if matches else None
 
 
 async def list_document_templates(category: str = "") -> str:
@@ -25,7 +169,7 @@ async def list_document_templates(category: str = "") -> str:
     try:
         # Convert empty string to None for the storage function
         category_filter = category if category else None
-        success, templates, message = list_templates(category_filter)
+        success, templates, message = await asyncio.to_thread(list_templates, category_filter)
 
         if not success:
             return f"Failed to list templates: {message}"
@@ -41,6 +185,9 @@ async def list_document_templates(category: str = "") -> str:
             "templates": []
         }
 
+        # Sign every download URL in one batch, without a round-trip per template
+        urls = get_template_urls([template['blob_name'] for template in templates])
+
         for template in templates:
             template_info = {
                 "name": template['name'],
@@ -52,18 +199,82 @@ async def list_document_templates(category: str = "") -> str:
             }
 
             # Add download URL if available
-            url = get_template_url(template['name'], template['category'])
+            url = urls.get(template['blob_name'])
             if url:
                 template_info['download_url'] = url
 
             result["templates"].append(template_info)
 
-        return json.dumps(result, indent=2)
+        return _dumps(result)
 
     except Exception as e:
         return f"Error listing templates: {str(e)}"
 
 
+async def list_template_categories() -> str:
+    """
+    List the template categories without listing the templates in them.
+
+    Returns:
+        JSON string with the category names
+    """
+    try:
+        from word_document_server.utils.template_storage import list_categories
+
+        success, categories, message = await asyncio.to_thread(list_categories)
+
+        if not success:
+            return f"Failed to list template categories: {message}"
+
+        return _dumps({
+            "total_categories": len(categories),
+            "categories": categories
+        })
+
+    except Exception as e:
+        return f"Error listing template categories: {str(e)}"
+
+
+def _clean_tables(doc) -> Dict[str, Any]:
+    """
+    Remove the data rows of every table, keeping the title and header rows.
+
+    Args:
+        doc: Document to clean in place
+
+    Returns:
+        Cleaning statistics with the list of table titles
+    """
+    from docx.oxml.ns import qn
+
+    cleaning_stats = {
+        "tables_cleaned": 0,
+        "rows_removed": 0,
+        "table_titles": []
+    }
+
+    # Clean all tables - keep title row (row 0) and header row (row 1)
+    for table_idx, table in enumerate(doc.tables):
+        tbl = table._element
+        row_elements = tbl.findall(qn('w:tr'))
+
+        # Extract title from first row (if it exists)
+        if row_elements:
+            # Get text from first row (title row), reading each cell's text once
+            title_cells = [text for text in (cell.text.strip() for cell in table.rows[0].cells) if text]
+            table_title = " - ".join(title_cells) or f"Tableau {table_idx + 1}"
+            cleaning_stats["table_titles"].append(table_title)
+
+        # Keep first 2 rows (title + header), remove the rest in one pass over the row elements
+        if len(row_elements) > 2:
+            for row_element in row_elements[2:]:
+                tbl.remove(row_element)
+            cleaning_stats["tables_cleaned"] += 1
+            cleaning_stats["rows_removed"] += len(row_elements) - 2
+
+    return cleaning_stats
+
+
 async def add_document_template(source_document: str, template_name: str,
                                category: str = "general", description: str = "",
                                author: str = "Unknown") -> str:
@@ -91,240 +302,241 @@ async def add_document_template(source_document: str, template_name: str,
     source_document = ensure_docx_extension(source_document)
 
     # Clean template name (remove .docx if provided)
-    if template_name.endswith('.docx'):
-        template_name = template_name[:-5]
+    template_name = template_name.removesuffix('.docx')
 
     # Track if we need to delete/replace source blob after template creation
     should_delete_source = False
     source_blob_client = None
     source_blob_name = None
     is_same_name = False  # Track if template_name matches source filename
+    source_location = None  # (container, blob) of a source read from blob storage
+    source_etag = None
 
-    try:
-        # Check if source_document is a blob path (starts with /word-templates/)
-        if source_document.startswith('/word-templates/') or source_document.startswith('word-templates/'):
-            # Remove leading slash if present
-            blob_path = source_document.lstrip('/')
-
-            # Get the document directly from the blob path
-            from word_document_server.utils.azure_storage import storage
-
-            if not storage.is_enabled():
-                return "Azure Blob Storage is not configured. Cannot retrieve document from blob path."
-
-            try:
-                # Extract container name from blob path
-                # blob_path is like "word-templates/Eric FER/file.docx"
-                path_parts = blob_path.split('/', 1)
-                if len(path_parts) < 2:
-                    return f"Invalid blob path format: {source_document}. Expected format: /container-name/path/to/file.docx"
-
-                container_name = path_parts[0]  # "word-templates"
-                blob_name = path_parts[1]  # "Eric FER/file.docx"
-
-                # Extract user folder from blob_name to use as category
-                # "Eric FER/file.docx" -> "Eric FER"
-                if '/' in blob_name:
-                    extracted_category = blob_name.split('/')[0]
-                    # Override category parameter with extracted folder name
-                    category = extracted_category
-
-                blob_client = storage.blob_service_client.get_blob_client(
-                    container=container_name,
-                    blob=blob_name
-                )
-
-                # Check if blob exists
-                if not blob_client.exists():
-                    return f"Source document not found at blob path: {source_document} (container: {container_name}, blob: {blob_name})"
-
-                # Download the blob
-                download_stream = blob_client.download_blob()
-                doc_data = download_stream.readall()
-
-                success = True
-                message = f"Retrieved from blob path: {blob_path} (container: {container_name}, category: {category})"
-
-                # Check if template_name matches source filename
-                source_filename = blob_name.split('/')[-1].replace('.docx', '')
-                if template_name == source_filename:
-                    # Same name: save_template will overwrite the source with cleaned version (no need to delete)
-                    should_delete_source = False
-                    source_blob_client = None
-                    source_blob_name = None
-                    is_same_name = True
-                else:
-                    # Different name: keep source file
-                    should_delete_source = False
-                    source_blob_client = None
-
-            except Exception as e:
-                return f"Failed to retrieve document from blob path '{source_document}': {str(e)}"
-        else:
-            # Use standard document storage retrieval (word-documents container)
-            success, doc_data, message = get_document_from_storage(source_document)
-
-            # If not found in word-documents, search in word-templates container
-            if not success:
-                from word_document_server.utils.azure_storage import storage
-
-                if storage.is_enabled():
-                    try:
-                        # Try to find the file in word-templates container
-                        container_client = storage.blob_service_client.get_container_client('word-templates')
-
-                        # List all blobs and find matching filename
-                        found_blob = None
-                        found_category = "general"
-
-                        # Extract just the filename from source_document if it contains a path
-                        source_filename_only = source_document.split('/')[-1]
-
-                        for blob in container_client.list_blobs():
-                            # Skip placeholder files
-                            if blob.name.endswith('/.keep') or blob.name == '.keep':
-                                continue
-
-                            # Check if filename matches (case insensitive)
-                            blob_filename = blob.name.split('/')[-1]  # Get just the filename
-                            if blob_filename.lower() == source_filename_only.lower():
-                                found_blob = blob.name
-                                # Extract category from path (e.g., "Eric FER/file.docx" -> "Eric FER")
-                                if '/' in blob.name:
-                                    found_category = blob.name.split('/')[0]
-                                break
-
-                        if found_blob:
-                            # Found the file in word-templates, download it
-                            blob_client = storage.blob_service_client.get_blob_client(
-                                container='word-templates',
-                                blob=found_blob
-                            )
-                            download_stream = blob_client.download_blob()
-                            doc_data = download_stream.readall()
-                            success = True
-                            message = f"Retrieved from word-templates: {found_blob}"
-                            category = found_category  # Override category with folder name
-
-                            # Check if template_name matches source filename
-                            source_filename = found_blob.split('/')[-1].replace('.docx', '')
-                            if template_name == source_filename:
-                                # Same name: save_template will overwrite the source with cleaned version (no need to delete)
-                                should_delete_source = False
-                                source_blob_client = None
-                                source_blob_name = None
-                                is_same_name = True
-                            else:
-                                # Different name: keep source file
-                                should_delete_source = False
-                                source_blob_client = None
-                        else:
-                            return f"Source document '{source_document}' not found in word-documents or word-templates containers"
-                    except Exception as e:
-                        return f"Source document '{source_document}' not found in word-documents: {message}. Failed to search word-templates: {str(e)}"
-                else:
-                    return f"Source document '{source_document}' not found: {message}"
+    # Check if source_document is a blob path (starts with /word-templates/)
+    if source_document.startswith('/word-templates/') or source_document.startswith('word-templates/'):
+        # Remove leading slash if present
+        blob_path = source_document.lstrip('/')
+
+        # Get the document directly from the blob path
+        from word_document_server.utils.azure_storage import get_storage
+        storage = get_storage()
+
+        if not storage.is_enabled():
+            return "Azure Blob Storage is not configured. Cannot retrieve document from blob path."
 
-        # Validate it's a proper Word document by trying to open it
         try:
-            doc = Document(io.BytesIO(doc_data))
-            # Basic validation - check if we can access paragraphs
-            _ = len(doc.paragraphs)
+            # Extract container name from blob path
+            # blob_path is like "word-templates/Eric FER/file.docx"
+            path_parts = blob_path.split('/', 1)
+            if len(path_parts) < 2:
+                return f"Invalid blob path format: {source_document}. Expected format: /container-name/path/to/file.docx"
+
+            container_name = path_parts[0]  # "word-templates"
+            blob_name = path_parts[1]  # "Eric FER/file.docx"
+
+            # Extract user folder from blob_name to use as category
+            # "Eric FER/file.docx" -> "Eric FER"
+            if '/' in blob_name:
+                extracted_category = blob_name.split('/')[0]
+                # Override category parameter with extracted folder name
+                category = extracted_category
+
+            blob_client = storage.blob_service_client.get_blob_client(
+                container=container_name,
+                blob=blob_name
+            )
+
+            # Check if blob exists
+            if not await blob_client.exists():
+                return f"Source document not found at blob path: {source_document} (container: {container_name}, blob: {blob_name})"
+
+            # Download the blob
+            download_stream = await blob_client.download_blob()
+            doc_data = await download_stream.readall()
+            source_location = (container_name, blob_name)
+            source_etag = download_stream.properties.etag
+
+            success = True
+            message = f"Retrieved from blob path: {blob_path} (container: {container_name}, category: {category})"
+
+            # Check if template_name matches source filename
+            source_filename = blob_name.split('/')[-1].replace('.docx', '')
+            if template_name == source_filename:
+                # Same name: save_template will overwrite the source with cleaned version (no need to delete)
+                should_delete_source = False
+                source_blob_client = None
+                source_blob_name = None
+                is_same_name = True
+            else:
+                # Different name: keep source file
+                should_delete_source = False
+                source_blob_client = None
+
         except Exception as e:
-            return f"Source document '{source_document}' is not a valid Word document: {str(e)}"
+            return f"Failed to retrieve document from blob path '{source_document}': {str(e)}"
+    else:
+        # Use standard document storage retrieval (word-documents container)
+        success, doc_data, message = await get_document_from_storage(source_document)
 
-        # === AUTOMATIC CLEANING ===
-        cleaning_stats = {
-            "tables_cleaned": 0,
-            "rows_removed": 0,
-            "table_titles": []
-        }
+        # If not found in word-documents, search in word-templates container
+        if not success:
+            from word_document_server.utils.azure_storage import get_storage
+            storage = get_storage()
+
+            if storage.is_enabled():
+                try:
+                    # Try to find the file in word-templates container
+                    container_client = storage.blob_service_client.get_container_client('word-templates')
+
+                    # Extract just the filename from source_document if it contains a path
+                    source_filename_only = source_document.split('/')[-1]
+
+                    found_blob = await _find_blob_by_filename(container_client, source_filename_only)
+                    found_category = "general"
+                    if found_blob and '/' in found_blob:
+                        # Extract category from path (e.g., "Eric FER/file.docx" -> "Eric FER")
+                        found_category = found_blob.split('/')[0]
+
+                    if found_blob:
+                        # Found the file in word-templates, download it
+                        blob_client = storage.blob_service_client.get_blob_client(
+                            container='word-templates',
+                            blob=found_blob
+                        )
+                        download_stream = await blob_client.download_blob()
+                        doc_data = await download_stream.readall()
+                        source_location = ('word-templates', found_blob)
+                        source_etag = download_stream.properties.etag
+                        success = True
+                        message = f"Retrieved from word-templates: {found_blob}"
+                        category = found_category  # Override category with folder name
+
+                        # Check if template_name matches source filename
+                        source_filename = found_blob.split('/')[-1].replace('.docx', '')
+                        if template_name == source_filename:
+                            # Same name: save_template will overwrite the source with cleaned version (no need to delete)
+                            should_delete_source = False
+                            source_blob_client = None
+                            source_blob_name = None
+                            is_same_name = True
+                        else:
+                            # Different name: keep source file
+                            should_delete_source = False
+                            source_blob_client = None
+                    else:
+                        return f"Source document '{source_document}' not found in word-documents or word-templates containers"
+                except Exception as e:
+                    return f"Source document '{source_document}' not found in word-documents: {message}. Failed to search word-templates: {str(e)}"
+            else:
+                return f"Source document '{source_document}' not found: {message}"
 
-        # Clean all tables - keep title row (row 0) and header row (row 1)
-        for table_idx, table in enumerate(doc.tables):
-            # Extract title from first row (if it exists)
-            table_title = ""
-            if len(table.rows) > 0:
-                # Get text from first row (title row)
-                title_cells = []
-                for cell in table.rows[0].cells:
-                    cell_text = cell.text.strip()
-                    if cell_text:
-                        title_cells.append(cell_text)
-
-                table_title = " - ".join(title_cells) if title_cells else f"Tableau {table_idx + 1}"
-                cleaning_stats["table_titles"].append(table_title)
-
-            # Keep first 2 rows (title + header), remove the rest
-            if len(table.rows) > 2:
-                rows_to_remove = len(table.rows) - 2
-                # Remove rows from bottom to top to avoid index issues
-                for _ in range(rows_to_remove):
-                    table._element.remove(table.rows[-1]._element)
-                cleaning_stats["tables_cleaned"] += 1
-                cleaning_stats["rows_removed"] += rows_to_remove
-
-        # Save the cleaned document
-        doc_buffer = io.BytesIO()
-        doc.save(doc_buffer)
-        cleaned_doc_data = doc_buffer.getvalue()
-        doc_buffer.close()
+    # Validate it's a proper Word document from the ZIP central directory, without parsing any XML
+    try:
+        with zipfile.ZipFile(io.BytesIO(doc_data)) as package:
+            part_names = set(package.namelist())
+    except zipfile.BadZipFile as e:
+        return f"Source document '{source_document}' is not a valid Word document: {str(e)}"
 
+    missing_parts = [name for name in (CONTENT_TYPES_PART, 'word/document.xml') if name not in part_names]
+    if missing_parts:
+        return f"Source document '{source_document}' is not a valid Word document: missing {', '.join(missing_parts)}"
+
+    # The document model is only needed for cleaning the tables
+    from docx import Document
+    try:
+        doc = await asyncio.to_thread(Document, io.BytesIO(doc_data))
+    except Exception as e:
+        return f"Source document '{source_document}' is not a valid Word document: {str(e)}"
+
+    # === AUTOMATIC CLEANING ===
+    # CPU bound, like the parse above and the repackaging below: keep it off the event loop
+    cleaning_stats = await asyncio.to_thread(_clean_tables, doc)
+
+    # When the template blob is the source blob itself, writes are tied to the version that was read
+    overwrite_etag = None
+    if source_location and source_location == get_template_location(template_name, category):
+        overwrite_etag = source_etag
+
+    if cleaning_stats["tables_cleaned"] > 0:
+        # Only the main document part changed: swap it into the source package rather than
+        # re-saving every part through python-docx, and upload straight from the buffer
+        try:
+            template_data = await asyncio.to_thread(
+                replace_package_parts, doc_data, {doc.part.partname.membername: doc.part.blob}
+            )
+        except Exception as e:
+            return f"Error adding template: {str(e)}"
+    else:
+        # Nothing was removed: the source bytes are already the template
+        template_data = doc_data
+
+    if overwrite_etag and template_data is doc_data:
+        # The template blob already holds these bytes: only its metadata changes
+        success, save_message = await asyncio.to_thread(
+            update_template_metadata,
+            template_name=template_name,
+            category=category,
+            description=description,
+            author=author,
+            if_match=overwrite_etag
+        )
+    else:
         # Save as template
-        success, save_message = save_template(
+        success, save_message = await asyncio.to_thread(
+            save_template,
             template_name=template_name,
-            template_data=cleaned_doc_data,
+            template_data=template_data,
             category=category,
             description=description,
-            author=author
+            author=author,
+            if_match=overwrite_etag
         )
 
-        if success:
-            # Handle source file status message
-            deletion_info = ""
-            if is_same_name:
-                # Same name: file was automatically replaced by save_template with overwrite=True
-                deletion_info = f"\n✅ File replaced with cleaned version (template overwrote source at same location)"
-            elif should_delete_source and source_blob_client:
-                # Different name but should delete source
-                try:
-                    source_blob_client.delete_blob()
-                    deletion_info = f"\n🗑️  Source file deleted from {source_document}"
-                except Exception as e:
-                    deletion_info = f"\n⚠️  Warning: Could not delete source file: {str(e)}"
-            else:
-                # Source file kept (different name)
-                if 'word-templates' in message.lower():
-                    deletion_info = f"\n📁 Source file kept (different name - both source and template exist)"
-
-            # Build cleaning summary
-            cleaning_summary = ""
-            if cleaning_stats['tables_cleaned'] > 0:
-                cleaning_summary = f"\n✓ Template cleaned: {cleaning_stats['tables_cleaned']} table(s) processed, {cleaning_stats['rows_removed']} data row(s) removed (keeping title + header rows)"
-
-            # Add table titles information
-            tables_info = ""
-            if cleaning_stats['table_titles']:
-                tables_info = "\n📋 Tables in template:\n"
-                for idx, title in enumerate(cleaning_stats['table_titles'], 1):
-                    tables_info += f"   {idx}. {title}\n"
-
-            # Try to get template URL
-            url = get_template_url(template_name, category)
-            if url:
-                return f"{save_message}{cleaning_summary}{tables_info}{deletion_info}\nTemplate URL: {url}"
-            else:
-                return f"{save_message}{cleaning_summary}{tables_info}{deletion_info}"
-        else:
-            return f"Failed to save template: {save_message}"
+    if not success:
+        return f"Failed to save template: {save_message}"
 
-    except Exception as e:
-        return f"Error adding template: {str(e)}"
+    _template_info_cache.pop((category, template_name), None)
+
+    # Handle source file status message
+    deletion_info = ""
+    if is_same_name:
+        # Same name: file was automatically replaced by save_template with overwrite=True
+        deletion_info = f"\n✅ File replaced with cleaned version (template overwrote source at same location)"
+    elif should_delete_source and source_blob_client:
+        # Different name but should delete source
+        try:
+            source_blob_client.delete_blob()
+            deletion_info = f"\n🗑️  Source file deleted from {source_document}"
+        except Exception as e:
+            deletion_info = f"\n⚠️  Warning: Could not delete source file: {str(e)}"
+    else:
+        # Source file kept (different name)
+        if 'word-templates' in message.lower():
+            deletion_info = f"\n📁 Source file kept (different name - both source and template exist)"
+
+    # Build cleaning summary
+    cleaning_summary = ""
+    if cleaning_stats['tables_cleaned'] > 0:
+        cleaning_summary = f"\n✓ Template cleaned: {cleaning_stats['tables_cleaned']} table(s) processed, {cleaning_stats['rows_removed']} data row(s) removed (keeping title + header rows)"
+
+    # Add table titles information
+    tables_info = ""
+    if cleaning_stats['table_titles']:
+        tables_info = "\n📋 Tables in template:\n"
+        for idx, title in enumerate(cleaning_stats['table_titles'], 1):
+            tables_info += f"   {idx}. {title}\n"
+
+    # Try to get template URL
+    url = await asyncio.to_thread(get_template_url, template_name, category)
+    if url:
+        return f"{save_message}{cleaning_summary}{tables_info}{deletion_info}\nTemplate URL: {url}"
+    else:
+        return f"{save_message}{cleaning_summary}{tables_info}{deletion_info}"
 
 
 async def create_document_from_template(template_name: str, new_document_name: str,
                                       category: str = "general",
-                                      variables: Dict[str, str] = {}) -> str:
+                                      variables: Optional[Dict[str, str]] = None) -> str:
     """
     Create a new document from an existing template.
 
@@ -342,93 +554,114 @@ async def create_document_from_template(template_name: str, new_document_name: s
     """
     new_document_name = ensure_docx_extension(new_document_name)
 
-    # Clean template name (remove .docx if provided)
-    if template_name.endswith('.docx'):
-        template_name = template_name[:-5]
-
-    # Check if template_name contains a path separator (category/name format)
-    if '/' in template_name:
-        # Extract category and actual template name from the path
-        path_parts = template_name.rsplit('/', 1)  # Split from right to get last part
-        if len(path_parts) == 2:
-            category = path_parts[0]  # e.g., "Eric FER"
-            template_name = path_parts[1]  # e.g., "Proposition commerciale Modern workplace 2024_1"
+    # Accept "Name", "Name.docx" and "Category/Name" forms
+    template_name, category = _split_template_id(template_name, category)
 
+    # Get the template from storage
     try:
-        # Get the template from storage
-        success, template_data, message = get_template(template_name, category)
+        success, template_data, _, message = await asyncio.to_thread(get_template_cached, template_name, category)
+    except Exception as e:
+        return f"error: {str(e)}"
 
-        if not success:
-            return f"error: template not found"
-
-        # Load the template as a Document
-        doc = Document(io.BytesIO(template_data))
-
-        # Apply variable substitutions if provided
-        if variables:
-            # Replace variables in paragraphs
-            for paragraph in doc.paragraphs:
-                for var_name, var_value in variables.items():
-                    if var_name in paragraph.text:
-                        # Replace in all runs to preserve formatting
-                        for run in paragraph.runs:
-                            if var_name in run.text:
-                                run.text = run.text.replace(var_name, var_value)
-
-            # Replace variables in tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for paragraph in cell.paragraphs:
-                            for var_name, var_value in variables.items():
-                                if var_name in paragraph.text:
-                                    for run in paragraph.runs:
-                                        if var_name in run.text:
-                                            run.text = run.text.replace(var_name, var_value)
-
-            # Replace variables in headers and footers
-            for section in doc.sections:
-                # Headers
-                if section.header:
-                    for paragraph in section.header.paragraphs:
-                        for var_name, var_value in variables.items():
-                            if var_name in paragraph.text:
-                                for run in paragraph.runs:
-                                    if var_name in run.text:
-                                        run.text = run.text.replace(var_name, var_value)
-
-                # Footers
-                if section.footer:
-                    for paragraph in section.footer.paragraphs:
-                        for var_name, var_value in variables.items():
-                            if var_name in paragraph.text:
-                                for run in paragraph.runs:
-                                    if var_name in run.text:
-                                        run.text = run.text.replace(var_name, var_value)
-
-        # Save the new document
-        doc_buffer = io.BytesIO()
-        doc.save(doc_buffer)
-        doc_data = doc_buffer.getvalue()
-        doc_buffer.close()
-
-        # Save to document storage
-        success, save_message = save_document_to_storage(new_document_name, doc_data)
-
-        if success:
-            # Get document URL if available
-            url = get_document_url(new_document_name)
+    if not success:
+        return f"error: template not found"
 
-            if url:
-                return f"ok\n{url}"
-            else:
-                return "ok"
-        else:
-            return f"error: {save_message}"
+    # Only non-empty variable names can occur in the document
+    variables = variables or {}
+    var_names = frozenset(var_name for var_name in variables if var_name)
+
+    if var_names:
+        # Single pattern over all variable names, compiled once per distinct set of names
+        pattern = compile_variables_pattern(var_names)
 
+        # The parsed template is cached; only parts containing a variable are cloned and rewritten.
+        # Parsing and rendering are CPU-bound, so keep them off the event loop
+        try:
+            skeleton = await asyncio.to_thread(get_template_skeleton, template_name, category, template_data)
+            doc_data = await asyncio.to_thread(skeleton.render, pattern, variables)
+        except Exception as e:
+            return f"error: {str(e)}"
+    else:
+        # Nothing to substitute: the new document is the template itself
+        doc_data = template_data
+
+    # Save to document storage
+    try:
+        success, save_message = await save_document_to_storage(new_document_name, doc_data)
     except Exception as e:
         return f"error: {str(e)}"
 
+    if not success:
+        return f"error: {save_message}"
+
+    # Get document URL if available
+    url = await get_document_url(new_document_name)
+    if url:
+        return f"ok\n{url}"
+    return "ok"
+
+
+def _analyze_template(doc, template_name: str, category: str) -> Dict[str, Any]:
+    """Analyze the structure and variables of a parsed template."""
+    # Analyze template content
+    paragraphs = doc.paragraphs
+    info = {
+        "name": template_name,
+        "category": category,
+        "statistics": {
+            "paragraphs": len(paragraphs),
+            "tables": len(doc.tables),
+            "sections": len(doc.sections)
+        },
+        "structure": [],
+        "variables_found": []
+    }
+
+    # Analyze structure and find variables
+    variables_found = set()
+    style_names = {}  # w:pStyle id -> style name, resolved once per distinct style
+
+    for i, paragraph in enumerate(paragraphs):
+        text = _short_text(paragraph._p)
+        if text:
+            para_info = {
+                "type": "paragraph",
+                "index": i,
+                "text": text
+            }
+
+            # Look for style information (read the style id from the XML, not the styles part)
+            style_id = paragraph._p.style
+            if style_id not in style_names:
+                style = paragraph.style
+                style_names[style_id] = style.name if style else None
+            style_name = style_names[style_id]
+            if style_name and style_name != 'Normal':
+                para_info["style"] = style_name
+
+            info["structure"].append(para_info)
+
+    # Find variables in format {{variable_name}} in a single pass over the body, headers and footers
+    for root in _text_part_roots(doc):
+        for p in _PARAGRAPHS(root):
+            vars_in_text = _VAR_RE.findall(''.join(p.itertext(W_TEXT)))
+            # Variable names recur across templates; interning shares one string per name
+            variables_found.update(sys.intern(var) for var in vars_in_text)
+
+    # Add table information
+    for i, table in enumerate(doc.tables):
+        table_info = {
+            "type": "table",
+            "index": i,
+            "rows": len(table.rows),
+            "columns": len(table.columns) if table.rows else 0
+        }
+        info["structure"].append(table_info)
+
+    info["variables_found"] = sorted(list(variables_found))
+
+    return info
+
 
 async def get_template_info(template_name: str, category: str = "general") -> str:
     """
@@ -443,84 +676,47 @@ async def get_template_info(template_name: str, category: str = "general") -> st
     Returns:
         JSON string with template information
     """
-    # Clean template name (remove .docx if provided)
-    if template_name.endswith('.docx'):
-        template_name = template_name[:-5]
-
-    # Check if template_name contains a path separator (category/name format)
-    if '/' in template_name:
-        # Extract category and actual template name from the path
-        path_parts = template_name.rsplit('/', 1)  # Split from right to get last part
-        if len(path_parts) == 2:
-            category = path_parts[0]  # e.g., "Eric FER"
-            template_name = path_parts[1]  # e.g., "Proposition commerciale Modern workplace 2024_1"
+    # Accept "Name", "Name.docx" and "Category/Name" forms
+    template_name, category = _split_template_id(template_name, category)
 
+    # Get template data to analyze, signing its download URL concurrently
     try:
-        # Get template data to analyze
-        success, template_data, message = get_template(template_name, category)
-
-        if not success:
-            return f"Template '{template_name}' in category '{category}' not found: {message}"
-
-        # Load template to analyze structure
-        doc = Document(io.BytesIO(template_data))
-
-        # Analyze template content
-        info = {
-            "name": template_name,
-            "category": category,
-            "statistics": {
-                "paragraphs": len(doc.paragraphs),
-                "tables": len(doc.tables),
-                "sections": len(doc.sections)
-            },
-            "structure": [],
-            "variables_found": []
-        }
-
-        # Analyze structure and find variables
-        variables_found = set()
-
-        for i, paragraph in enumerate(doc.paragraphs):
-            if paragraph.text.strip():
-                para_info = {
-                    "type": "paragraph",
-                    "index": i,
-                    "text": paragraph.text[:100] + "..." if len(paragraph.text) > 100 else paragraph.text
-                }
-
-                # Look for style information
-                if paragraph.style and paragraph.style.name != 'Normal':
-                    para_info["style"] = paragraph.style.name
-
-                info["structure"].append(para_info)
+        (success, template_data, etag, message), url = await asyncio.gather(
+            asyncio.to_thread(get_template_cached, template_name, category),
+            asyncio.to_thread(get_template_url, template_name, category)
+        )
+    except Exception as e:
+        return f"Error getting template info: {str(e)}"
 
-                # Find variables in format {{variable_name}}
-                import re
-                vars_in_text = re.findall(r'\{\{([^}]+)\}\}', paragraph.text)
-                variables_found.update(vars_in_text)
+    if not success:
+        return f"Template '{template_name}' in category '{category}' not found: {message}"
+
+    # Reuse the analysis while the template is unchanged
+    cache_key = (category, template_name)
+    cached = _template_info_cache.get(cache_key)
+    if etag and cached is not None and cached[0] == etag:
+        _template_info_cache.move_to_end(cache_key)
+        info = dict(cached[1])
+    else:
+        # Load template to analyze structure, off the event loop so concurrent tool calls are not blocked
+        from docx import Document
+        try:
+            doc = await asyncio.to_thread(Document, io.BytesIO(template_data))
+        except Exception as e:
+            return f"Error getting template info: {str(e)}"
 
-        # Add table information
-        for i, table in enumerate(doc.tables):
-            table_info = {
-                "type": "table",
-                "index": i,
-                "rows": len(table.rows),
-                "columns": len(table.columns) if table.rows else 0
-            }
-            info["structure"].append(table_info)
+        info = await asyncio.to_thread(_analyze_template, doc, template_name, category)
+        _template_info_cache[cache_key] = (etag, info)
+        _template_info_cache.move_to_end(cache_key)
+        while len(_template_info_cache) > TEMPLATE_INFO_CACHE_SIZE:
+            _template_info_cache.popitem(last=False)
+        info = dict(info)
 
-        info["variables_found"] = sorted(list(variables_found))
+    # Add download URL if available
+    if url:
+        info["download_url"] = url
 
-        # Add download URL if available
-        url = get_template_url(template_name, category)
-        if url:
-            info["download_url"] = url
-
-        return json.dumps(info, indent=2)
-
-    except Exception as e:
-        return f"Error getting template info: {str(e)}"
+    return _dumps(info)
 
 
 async def delete_document_template(template_name: str, category: str = "general") -> str:
@@ -536,23 +732,42 @@ async def delete_document_template(template_name: str, category: str = "general"
     Returns:
         Success message or error description
     """
-    # Clean template name (remove .docx if provided)
-    if template_name.endswith('.docx'):
-        template_name = template_name[:-5]
-
-    # Check if template_name contains a path separator (category/name format)
-    if '/' in template_name:
-        # Extract category and actual template name from the path
-        path_parts = template_name.rsplit('/', 1)  # Split from right to get last part
-        if len(path_parts) == 2:
-            category = path_parts[0]  # e.g., "Eric FER"
-            template_name = path_parts[1]  # e.g., "Proposition commerciale Modern workplace 2024_1"
+    # Accept "Name", "Name.docx" and "Category/Name" forms
+    template_name, category = _split_template_id(template_name, category)
 
     try:
         from word_document_server.utils.template_storage import delete_template
 
-        success, message = delete_template(template_name, category)
+        success, message = await asyncio.to_thread(delete_template, template_name, category)
+        _template_info_cache.pop((category, template_name), None)
+        return message
+
+    except Exception as e:
+        return f"Error deleting template: {str(e)}"
+
+
+async def delete_document_templates(template_names: List[str], category: str = "general") -> str:
+    """
+    Delete several templates from the template library in batched requests.
+
+    Args:
+        template_names: Names of the templates to delete, in the same forms
+                        accepted by delete_document_template
+        category: Template category for names without a path (default: "general")
+
+    Returns:
+        Summary of the deleted templates or error description
+    """
+    # Accept "Name", "Name.docx" and "Category/Name" forms
+    templates = [_split_template_id(name, category) for name in template_names]
+
+    try:
+        from word_document_server.utils.template_storage import delete_templates
+
+        success, count, message = await asyncio.to_thread(delete_templates, templates)
+        for template_name, template_category in templates:
+            _template_info_cache.pop((template_category, template_name), None)
         return message
 
     except Exception as e:
-        return f"Error deleting template: {str(e)}"
\ No newline at end of file
+        return f"Error deleting templates: {str(e)}"
\ No newline at end of file
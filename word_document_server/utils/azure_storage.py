@@ -1,16 +1,27 @@
 """
 Azure Blob Storage integration for Word Document Server.
 Handles file persistence with TTL (Time To Live) cleanup.
+
+Uses the asyncio client so concurrent tool calls do not block the event loop
+while waiting on storage.
 """
 import os
 import io
+import asyncio
+import shutil
 import tempfile
+import time
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Tuple
-from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions
-from azure.core.exceptions import ResourceNotFoundError
-from azure.identity import DefaultAzureCredential
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple, Union, BinaryIO
+from urllib.parse import quote, unquote
+from azure.storage.blob import generate_blob_sas, BlobSasPermissions
+from azure.storage.blob.aio import BlobServiceClient
+from azure.core.exceptions import ResourceNotFoundError, ResourceExistsError
+from azure.identity.aio import DefaultAzureCredential
+
+from word_document_server.utils.file_utils import data_size, parse_connection_string, upload_body
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -31,6 +42,49 @@ if not logger.handlers:
     else:
         logger.setLevel(logging.INFO)
 
+# Binary mode for raw file descriptors (only defined on Windows)
+_O_BINARY = getattr(os, 'O_BINARY', 0)
+
+DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# Maximum number of blob deletes in flight during cleanup
+CLEANUP_CONCURRENCY = 32
+
+# Downloads larger than this are spooled to a temporary file instead of memory
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+# Blobs requested per listing page
+LIST_PAGE_SIZE = 1000
+
+# Maximum number of signed download URLs kept for reuse
+SAS_CACHE_SIZE = 1024
+
+# Maximum number of resolved blob names remembered for signing URLs
+BLOB_NAME_CACHE_SIZE = 1024
+
+# Client transport and retry settings. The aiohttp session behind the client
+# pools connections and is shared by every container and blob client derived
+# from it; the storage retry default starts backing off at 15s.
+CLIENT_OPTIONS = {
+    'connection_timeout': 5,
+    'read_timeout': 30,
+    'retry_total': 3,
+    'initial_backoff': 0.5,
+    'increment_base': 2,
+}
+
+
+def _is_expired(metadata: dict, now: float) -> bool:
+    """Check blob metadata against the current epoch time."""
+    expires_at_epoch = metadata.get('expires_at_epoch')
+    if expires_at_epoch:
+        return now > int(expires_at_epoch)
+    # Documents saved before expires_at_epoch only carry the ISO time (UTC)
+    if 'expires_at' in metadata:
+        expires_at = datetime.fromisoformat(metadata['expires_at']).replace(tzinfo=timezone.utc)
+        return now > expires_at.timestamp()
+    return False
+
 
 class AzureBlobStorage:
     """Azure Blob Storage client with TTL support."""
@@ -42,51 +96,120 @@ class AzureBlobStorage:
         account_name = os.getenv('AZURE_STORAGE_ACCOUNT_NAME')
         container_name = os.getenv('AZURE_STORAGE_CONTAINER_NAME', 'word-documents')
 
+        self._credential = None
+        # SAS generation needs the account key, only available from a connection string
+        self._account_name, self._account_key = parse_connection_string(connection_string)
+
         if connection_string:
-            self.blob_service_client = BlobServiceClient.from_connection_string(connection_string)
+            self.blob_service_client = BlobServiceClient.from_connection_string(connection_string, **CLIENT_OPTIONS)
         elif account_name:
             # Use managed identity
-            credential = DefaultAzureCredential()
+            self._credential = DefaultAzureCredential()
             account_url = f"https://{account_name}.blob.core.windows.net"
-            self.blob_service_client = BlobServiceClient(account_url, credential=credential)
+            self.blob_service_client = BlobServiceClient(account_url, credential=self._credential, **CLIENT_OPTIONS)
         else:
             # Fallback to local storage if no Azure config
             self.blob_service_client = None
 
         self.container_name = container_name
+        self.container_client = (
+            self.blob_service_client.get_container_client(container_name)
+            if self.blob_service_client else None
+        )
         self.ttl_hours = int(os.getenv('DOCUMENT_TTL_HOURS', '24'))
+        self._ttl_seconds = self.ttl_hours * 3600
+        self._ttl_hours_str = str(self.ttl_hours)
 
-        # Initialize container if using Azure
-        if self.blob_service_client:
-            self._ensure_container_exists()
+        # Signed URLs by (blob name, expiry hours, hour of signing), least recent first
+        self._sas_cache = OrderedDict()
+        # Stored blob name by normalized name, for documents saved or found
+        # earlier, least recent first
+        self._blob_names = OrderedDict()
 
-    def _ensure_container_exists(self):
-        """Ensure the blob container exists - PRIVATE by default for security."""
+    async def _create_container(self):
+        """Create the blob container - PRIVATE by default for security."""
         try:
-            container_client = self.blob_service_client.get_container_client(self.container_name)
-            if not container_client.exists():
-                # SECURITY: Create private container (no public access)
-                container_client.create_container()
-                logger.info(f"Created PRIVATE container: {self.container_name}")
-        except Exception as e:
-            logger.error(f"Warning: Could not ensure container exists: {e}")
+            # SECURITY: Create private container (no public access)
+            await self.container_client.create_container()
+            logger.info(f"Created PRIVATE container: {self.container_name}")
+        except ResourceExistsError:
+            pass
+
+    async def close(self):
+        """Close the client and its connection pool."""
+        if self.blob_service_client:
+            await self.blob_service_client.close()
+        if self._credential:
+            await self._credential.close()
 
     def is_enabled(self) -> bool:
         """Check if Azure Blob Storage is enabled."""
         return self.blob_service_client is not None
 
-    def save_file(self, filename: str, file_data: bytes) -> Tuple[bool, str]:
+    @staticmethod
+    def blob_name(filename: str) -> str:
+        """Return the blob name a document is stored under."""
+        return filename.lower()
+
+    def _remember_blob_name(self, filename: str, name: str) -> None:
+        """Record the blob a document is stored under, for get_file_url."""
+        key = self.blob_name(filename)
+        self._blob_names[key] = name
+        self._blob_names.move_to_end(key)
+        while len(self._blob_names) > BLOB_NAME_CACHE_SIZE:
+            self._blob_names.popitem(last=False)
+
+    async def _find_blob(self, filename: str):
+        """
+        Locate the blob holding a document.
+
+        Tries the normalized name, then the name as given, then a
+        case-insensitive match among blobs sharing its first character (for
+        documents saved before names were normalized).
+
+        Returns:
+            Tuple of (blob_client, metadata), or (None, None) if not found
+        """
+        names = dict.fromkeys((self.blob_name(filename), filename))
+        for name in names:
+            blob_client = self.container_client.get_blob_client(name)
+            try:
+                logger.info(f"Checking for exact match: {name}")
+                properties = await blob_client.get_blob_properties()
+                logger.info(f"Found file with exact match: {name}")
+                self._remember_blob_name(filename, name)
+                return blob_client, properties.metadata or {}
+            except ResourceNotFoundError:
+                pass
+
+        logger.info(f"Exact match not found for {filename}, trying case-insensitive search")
+        filename_lower = filename.lower()
+
+        # Only names sharing the first character (in either case) can match,
+        # so let the service filter on that prefix
+        for prefix in dict.fromkeys((filename[:1].lower(), filename[:1].upper())):
+            async for blob in self.container_client.list_blobs(name_starts_with=prefix, include=['metadata']):
+                if blob.name.lower() == filename_lower and blob.name not in names:
+                    logger.info(f"Found case-insensitive match: {blob.name} for requested {filename}")
+                    blob_client = self.container_client.get_blob_client(blob.name)
+                    self._remember_blob_name(filename, blob.name)
+                    return blob_client, blob.metadata or {}
+
+        return None, None
+
+    async def save_file(self, filename: str, file_data: Union[bytes, memoryview, BinaryIO]) -> Tuple[bool, str]:
         """
         Save file to Azure Blob Storage with TTL metadata.
 
         Args:
             filename: Name of the file
-            file_data: Binary data of the file
+            file_data: Binary data of the file, or a stream positioned at its start
 
         Returns:
             Tuple of (success, message/error)
         """
-        logger.info(f"Attempting to save file: {filename} (size: {len(file_data)} bytes)")
+        file_size = data_size(file_data)
+        logger.info(f"Attempting to save file: {filename} (size: {file_size} bytes)")
 
         if not self.is_enabled():
             logger.info("Azure Blob Storage not enabled, falling back to local storage")
@@ -94,28 +217,44 @@ class AzureBlobStorage:
             return self._save_local(filename, file_data)
 
         try:
-            blob_client = self.blob_service_client.get_blob_client(
-                container=self.container_name,
-                blob=filename
-            )
+            blob_client = self.container_client.get_blob_client(self.blob_name(filename))
+            file_data = upload_body(file_data)
 
             # Set expiry time
-            expiry_time = datetime.utcnow() + timedelta(hours=self.ttl_hours)
+            now = datetime.now(timezone.utc)
+            expiry_time = now + timedelta(hours=self.ttl_hours)
 
             metadata = {
-                'created_at': datetime.utcnow().isoformat(),
+                'created_at': now.isoformat(),
                 'expires_at': expiry_time.isoformat(),
-                'ttl_hours': str(self.ttl_hours)
+                'expires_at_epoch': str(int(time.time()) + self._ttl_seconds),
+                'ttl_hours': self._ttl_hours_str,
+                # Metadata must be ASCII; keep the display name percent-encoded
+                'original_name': quote(filename)
             }
 
-            logger.info(f"Uploading blob: {filename} to container: {self.container_name}")
-            blob_client.upload_blob(
-                file_data,
-                overwrite=True,
-                metadata=metadata,
-                content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            )
+            logger.info(f"Uploading blob: {blob_client.blob_name} to container: {self.container_name}")
+            start = None if isinstance(file_data, (bytes, bytearray, memoryview)) else file_data.tell()
+
+            async def upload():
+                await blob_client.upload_blob(
+                    file_data,
+                    length=file_size,
+                    overwrite=True,
+                    metadata=metadata,
+                    content_type=DOCX_CONTENT_TYPE
+                )
 
+            try:
+                await upload()
+            except ResourceNotFoundError:
+                # The container is assumed to exist; create it on the first miss
+                await self._create_container()
+                if start is not None:
+                    file_data.seek(start)
+                await upload()
+
+            self._remember_blob_name(filename, blob_client.blob_name)
             logger.info(f"Successfully saved file: {filename}")
             return True, f"File {filename} saved to Azure Blob Storage (expires in {self.ttl_hours}h)"
 
@@ -123,7 +262,7 @@ class AzureBlobStorage:
             logger.error(f"Failed to save file {filename}: {str(e)}")
             return False, f"Failed to save to Azure Blob Storage: {str(e)}"
 
-    def get_file(self, filename: str) -> Tuple[bool, Optional[bytes], str]:
+    async def get_file(self, filename: str) -> Tuple[bool, Optional[bytes], str]:
         """
         Retrieve file from Azure Blob Storage with case-insensitive search.
 
@@ -141,83 +280,99 @@ class AzureBlobStorage:
             return self._get_local(filename)
 
         try:
-            # First try exact match
-            blob_client = self.blob_service_client.get_blob_client(
-                container=self.container_name,
-                blob=filename
-            )
+            download_stream, message = await self._download(filename)
+            if download_stream is None:
+                return False, None, message
 
-            # Check if blob exists and get metadata
-            try:
-                logger.info(f"Checking for exact match: {filename}")
-                properties = blob_client.get_blob_properties()
-                metadata = properties.metadata or {}
-
-                # Check if file has expired
-                if 'expires_at' in metadata:
-                    expires_at = datetime.fromisoformat(metadata['expires_at'])
-                    if datetime.utcnow() > expires_at:
-                        logger.info(f"File {filename} has expired, deleting")
-                        # File has expired, delete it
-                        blob_client.delete_blob()
-                        return False, None, f"File {filename} has expired and was deleted"
-
-                # File found with exact match
-                logger.info(f"Found file with exact match: {filename}")
+            file_data = await download_stream.readall()
+            logger.info(f"Successfully retrieved {len(file_data)} bytes")
 
-            except ResourceNotFoundError:
-                logger.info(f"Exact match not found for {filename}, trying case-insensitive search")
-
-                # Try case-insensitive search
-                container_client = self.blob_service_client.get_container_client(self.container_name)
-                filename_lower = filename.lower()
-                matching_blob = None
-
-                logger.info(f"Searching for case-insensitive match of: {filename_lower}")
-                for blob in container_client.list_blobs():
-                    if blob.name.lower() == filename_lower:
-                        logger.info(f"Found case-insensitive match: {blob.name} for requested {filename}")
-                        matching_blob = blob.name
-                        break
-
-                if not matching_blob:
-                    logger.warning(f"No case-insensitive match found for: {filename}")
-                    # List all blobs for debugging
-                    all_blobs = [blob.name for blob in container_client.list_blobs()]
-                    logger.info(f"Available blobs: {all_blobs}")
-                    return False, None, f"File {filename} not found (searched case-insensitively). Available files: {all_blobs}"
-
-                # Update blob_client to use the found filename
-                blob_client = self.blob_service_client.get_blob_client(
-                    container=self.container_name,
-                    blob=matching_blob
-                )
+            return True, file_data, message
 
-                # Re-check metadata for the found file
-                properties = blob_client.get_blob_properties()
-                metadata = properties.metadata or {}
-
-                # Check if file has expired
-                if 'expires_at' in metadata:
-                    expires_at = datetime.fromisoformat(metadata['expires_at'])
-                    if datetime.utcnow() > expires_at:
-                        logger.info(f"Found file {matching_blob} has expired, deleting")
-                        blob_client.delete_blob()
-                        return False, None, f"File {filename} (found as {matching_blob}) has expired and was deleted"
-
-            # Download the blob
-            logger.info(f"Downloading blob data")
-            download_stream = blob_client.download_blob()
-            file_data = download_stream.readall()
-            logger.info(f"Successfully retrieved {len(file_data)} bytes")
+        except ResourceNotFoundError:
+            # The container, or the blob since it was found, does not exist
+            return False, None, f"File {filename} not found"
+        except Exception as e:
+            logger.error(f"Failed to retrieve file {filename}: {str(e)}")
+            return False, None, f"Failed to retrieve from Azure Blob Storage: {str(e)}"
+
+    async def get_file_stream(self, filename: str) -> Tuple[bool, Optional[BinaryIO], str]:
+        """
+        Retrieve file from Azure Blob Storage as a seekable stream.
+
+        The download is written straight into a spooled temporary file, which
+        stays in memory for small documents and moves to disk for large ones.
+        The caller is responsible for closing the stream.
+
+        Args:
+            filename: Name of the file to retrieve
+
+        Returns:
+            Tuple of (success, stream positioned at the start, message)
+        """
+        logger.info(f"Attempting to retrieve file: {filename}")
 
-            return True, file_data, f"File {filename} retrieved from Azure Blob Storage"
+        if not self.is_enabled():
+            logger.info("Azure Blob Storage not enabled, falling back to local storage")
+            try:
+                return True, open(filename, 'rb'), f"File {filename} retrieved locally"
+            except FileNotFoundError:
+                return False, None, f"File {filename} not found locally"
+            except Exception as e:
+                return False, None, f"Failed to retrieve locally: {str(e)}"
 
+        try:
+            download_stream, message = await self._download(filename)
+            if download_stream is None:
+                return False, None, message
+
+            spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+            try:
+                await download_stream.readinto(spool)
+            except BaseException:
+                spool.close()
+                raise
+            spool.seek(0)
+            logger.info(f"Successfully retrieved {download_stream.size} bytes")
+
+            return True, spool, message
+
+        except ResourceNotFoundError:
+            # The container, or the blob since it was found, does not exist
+            return False, None, f"File {filename} not found"
         except Exception as e:
             logger.error(f"Failed to retrieve file {filename}: {str(e)}")
             return False, None, f"Failed to retrieve from Azure Blob Storage: {str(e)}"
 
-    def list_files(self) -> Tuple[bool, list, str]:
+    async def _download(self, filename: str):
+        """
+        Start downloading a document, deleting it instead if it has expired.
+
+        Returns:
+            Tuple of (download_stream, message); download_stream is None if the
+            file is missing or expired
+        """
+        # Documents are stored under their lowercased name, so the exact
+        # lookup normally hits; fall back for blobs saved before that
+        blob_client, metadata = await self._find_blob(filename)
+
+        if blob_client is None:
+            logger.warning(f"No case-insensitive match found for: {filename}")
+            return None, f"File {filename} not found (searched case-insensitively)"
+
+        # Check if file has expired
+        if _is_expired(metadata, time.time()):
+            logger.info(f"File {blob_client.blob_name} has expired, deleting")
+            # File has expired, delete it
+            await blob_client.delete_blob()
+            return None, f"File {filename} has expired and was deleted"
+
+        # Download the blob
+        logger.info(f"Downloading blob data")
+        download_stream = await blob_client.download_blob()
+        return download_stream, f"File {filename} retrieved from Azure Blob Storage"
+
+    async def list_files(self) -> Tuple[bool, list, str]:
         """
         List all files in storage.
 
@@ -231,37 +386,99 @@ class AzureBlobStorage:
             return self._list_local()
 
         try:
-            container_client = self.blob_service_client.get_container_client(self.container_name)
             blob_list = []
+            now = time.time()
 
             logger.info(f"Listing blobs from container: {self.container_name}")
-            for blob in container_client.list_blobs(include=['metadata']):
-                metadata = blob.metadata or {}
-                logger.debug(f"Found blob: {blob.name} (size: {blob.size}, metadata: {metadata})")
-
-                # Check expiry
-                expired = False
-                if 'expires_at' in metadata:
-                    expires_at = datetime.fromisoformat(metadata['expires_at'])
-                    expired = datetime.utcnow() > expires_at
-
-                blob_info = {
-                    'name': blob.name,
-                    'size': blob.size,
-                    'created': metadata.get('created_at', 'Unknown'),
-                    'expires': metadata.get('expires_at', 'No expiry'),
-                    'expired': expired
-                }
-                blob_list.append(blob_info)
+            async for blob in self._list_blobs(include=['metadata']):
+                blob_list.append(self._blob_info(blob, now))
 
             logger.info(f"Found {len(blob_list)} files in storage")
             return True, blob_list, f"Found {len(blob_list)} files"
 
+        except ResourceNotFoundError:
+            # The container has not been created yet
+            return True, [], "Found 0 files"
         except Exception as e:
             logger.error(f"Failed to list files: {str(e)}")
             return False, [], f"Failed to list files: {str(e)}"
 
-    def cleanup_expired_files(self) -> Tuple[bool, int, str]:
+    async def list_files_page(self, page_token: Optional[str] = None, page_size: int = 200) -> Tuple[bool, list, Optional[str], str]:
+        """
+        List one page of files in storage.
+
+        Args:
+            page_token: Continuation token from the previous page, or None for the first
+            page_size: Maximum number of files to return
+
+        Returns:
+            Tuple of (success, file_list, next_page_token, message); the token is
+            None once the last page has been returned
+        """
+        if not self.is_enabled():
+            success, file_list, message = self._list_local()
+            return success, file_list, None, message
+
+        try:
+            blob_list = []
+            now = time.time()
+
+            pages = self.container_client.list_blobs(
+                include=['metadata'],
+                results_per_page=page_size
+            ).by_page(continuation_token=page_token)
+
+            async for page in pages:
+                async for blob in page:
+                    blob_list.append(self._blob_info(blob, now))
+                break
+
+            return True, blob_list, pages.continuation_token, f"Found {len(blob_list)} files"
+
+        except ResourceNotFoundError:
+            # The container has not been created yet
+            return True, [], None, "Found 0 files"
+        except Exception as e:
+            logger.error(f"Failed to list files: {str(e)}")
+            return False, [], None, f"Failed to list files: {str(e)}"
+
+    async def _list_blobs(self, **kwargs):
+        """
+        Iterate over every blob in the container.
+
+        The next page is requested as soon as the current one arrives, so
+        its round trip overlaps with processing the current page.
+        """
+        pages = self.container_client.list_blobs(results_per_page=LIST_PAGE_SIZE, **kwargs).by_page()
+        next_page = asyncio.ensure_future(anext(pages, None))
+        try:
+            while True:
+                page = await next_page
+                if page is None:
+                    return
+                next_page = asyncio.ensure_future(anext(pages, None))
+                async for blob in page:
+                    yield blob
+        finally:
+            next_page.cancel()
+
+    @staticmethod
+    def _blob_info(blob, now: float) -> dict:
+        """Describe a listed blob for the file listings."""
+        metadata = blob.metadata or {}
+        logger.debug(f"Found blob: {blob.name} (size: {blob.size}, metadata: {metadata})")
+
+        return {
+            'name': unquote(metadata.get('original_name', blob.name)),
+            # The name the blob is actually stored under, for signing its URL
+            'blob_name': blob.name,
+            'size': blob.size,
+            'created': metadata.get('created_at', 'Unknown'),
+            'expires': metadata.get('expires_at', 'No expiry'),
+            'expired': _is_expired(metadata, now)
+        }
+
+    async def cleanup_expired_files(self) -> Tuple[bool, int, str]:
         """
         Clean up expired files from storage.
 
@@ -271,35 +488,78 @@ class AzureBlobStorage:
         if not self.is_enabled():
             return True, 0, "Azure Blob Storage not enabled, no cleanup needed"
 
-        try:
-            container_client = self.blob_service_client.get_container_client(self.container_name)
-            deleted_count = 0
+        # Same pass as list_and_sweep, so both apply the same expiry rule
+        success, _, deleted_count, message = await self.list_and_sweep()
+        if not success:
+            return False, 0, message
+        return True, deleted_count, f"Cleaned up {deleted_count} expired files"
+
+    async def list_and_sweep(self) -> Tuple[bool, list, int, str]:
+        """
+        List the live files and delete the expired ones in a single listing pass.
 
-            for blob in container_client.list_blobs(include=['metadata']):
-                metadata = blob.metadata or {}
+        Returns:
+            Tuple of (success, live_file_list, count_deleted, message)
+        """
+        if not self.is_enabled():
+            success, file_list, message = self._list_local()
+            return success, file_list, 0, message
 
-                if 'expires_at' in metadata:
-                    expires_at = datetime.fromisoformat(metadata['expires_at'])
-                    if datetime.utcnow() > expires_at:
-                        blob_client = self.blob_service_client.get_blob_client(
-                            container=self.container_name,
-                            blob=blob.name
-                        )
-                        blob_client.delete_blob()
-                        deleted_count += 1
+        try:
+            blob_list = []
+            to_delete = []
+            now = time.time()
+
+            # Expiry comes from each blob's own metadata: blobs saved under another
+            # TTL keep theirs, and blobs without expiry metadata are never deleted
+            async for blob in self._list_blobs(include=['metadata']):
+                blob_info = self._blob_info(blob, now)
+                if blob_info['expired']:
+                    to_delete.append(blob.name)
+                else:
+                    blob_list.append(blob_info)
 
-            return True, deleted_count, f"Cleaned up {deleted_count} expired files"
+            deleted_count = await self._delete_blobs(to_delete)
+            return True, blob_list, deleted_count, f"Found {len(blob_list)} files, cleaned up {deleted_count} expired files"
 
+        except ResourceNotFoundError:
+            # The container has not been created yet
+            return True, [], 0, "Found 0 files"
         except Exception as e:
-            return False, 0, f"Failed to cleanup files: {str(e)}"
-
-    def get_file_url(self, filename: str, expiry_hours: int = 24) -> Optional[str]:
+            logger.error(f"Failed to list files: {str(e)}")
+            return False, [], 0, f"Failed to list files: {str(e)}"
+
+    async def _delete_blobs(self, names: list) -> int:
+        """Delete blobs concurrently and return how many were deleted."""
+        # Issue the deletes concurrently, capped to avoid service throttling
+        semaphore = asyncio.Semaphore(CLEANUP_CONCURRENCY)
+
+        async def delete(name):
+            async with semaphore:
+                await self.container_client.delete_blob(name)
+
+        results = await asyncio.gather(*(delete(name) for name in names), return_exceptions=True)
+        deleted_count = 0
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to delete expired file {name}: {result}")
+            else:
+                deleted_count += 1
+        return deleted_count
+
+    async def get_file_url(self, filename: str, expiry_hours: int = 24, verify_exists: bool = False) -> Optional[str]:
         """
         Get SAS URL for a file with temporary access if Azure Blob Storage is enabled.
 
+        Documents saved or found earlier are signed without a request; any
+        other document is looked up first, so one stored under a name other
+        than its normalized one (saved before names were normalized) gets a
+        URL for the blob that actually exists.
+
         Args:
             filename: Name of the file
             expiry_hours: Hours until the SAS URL expires (default: 24)
+            verify_exists: Always check the blob exists first
 
         Returns:
             SAS URL with temporary access or None if not available
@@ -308,56 +568,78 @@ class AzureBlobStorage:
             return None
 
         try:
-            blob_client = self.blob_service_client.get_blob_client(
-                container=self.container_name,
-                blob=filename
-            )
+            name = None if verify_exists else self._blob_names.get(self.blob_name(filename))
+            if name is None:
+                blob_client, _ = await self._find_blob(filename)
+                if blob_client is None:
+                    return None
+                name = blob_client.blob_name
 
-            # Check if blob exists
-            if not blob_client.exists():
-                return None
+            return self.get_blob_url(name, expiry_hours)
 
-            # SECURITY: Always generate SAS token with TTL - no fallback to public URL
-            try:
-                # Get account key from connection string
-                connection_string = os.getenv('AZURE_STORAGE_CONNECTION_STRING')
-                if not connection_string:
-                    logger.error("AZURE_STORAGE_CONNECTION_STRING not configured - cannot generate SAS URL")
-                    return None
+        except Exception as e:
+            logger.error(f"Error getting URL for {filename}: {e}")
+            return None
+
+    def get_blob_url(self, blob_name: str, expiry_hours: int = 24) -> Optional[str]:
+        """
+        Get SAS URL for a blob by the exact name it is stored under.
 
-                # Extract account name and key from connection string
-                parts = dict(item.split('=', 1) for item in connection_string.split(';') if '=' in item)
-                account_name = parts.get('AccountName')
-                account_key = parts.get('AccountKey')
+        Signing is local, so no request is made and a URL for a missing blob
+        simply fails when it is used.
 
-                if not account_name or not account_key:
-                    logger.error("Could not extract AccountName or AccountKey from connection string")
-                    return None
+        Args:
+            blob_name: Name of the blob, as returned in the file listings
+            expiry_hours: Hours until the SAS URL expires (default: 24)
 
-                # Generate SAS token with TTL
-                sas_token = generate_blob_sas(
-                    account_name=account_name,
-                    container_name=self.container_name,
-                    blob_name=filename,
-                    account_key=account_key,
-                    permission=BlobSasPermissions(read=True),
-                    expiry=datetime.utcnow() + timedelta(hours=expiry_hours)
-                )
+        Returns:
+            SAS URL with temporary access or None if not available
+        """
+        if not self.is_enabled():
+            return None
 
-                # Return URL with SAS token
-                sas_url = f"{blob_client.url}?{sas_token}"
-                logger.debug(f"Generated SAS URL for {filename} (expires in {expiry_hours}h)")
-                return sas_url
+        blob_client = self.container_client.get_blob_client(blob_name)
 
-            except Exception as e:
-                logger.error(f"Failed to generate SAS token for {filename}: {e}")
+        # SECURITY: Always generate SAS token with TTL - no fallback to public URL
+        try:
+            if not self._account_name or not self._account_key:
+                logger.error("AccountName/AccountKey not available from AZURE_STORAGE_CONNECTION_STRING - cannot generate SAS URL")
                 return None
 
+            # Reuse the URL signed earlier in the same hour: it expires at
+            # the end of that hour plus expiry_hours, so it still has at
+            # least expiry_hours left
+            hour = int(time.time() // 3600)
+            cache_key = (blob_client.blob_name, expiry_hours, hour)
+            sas_url = self._sas_cache.get(cache_key)
+            if sas_url is not None:
+                self._sas_cache.move_to_end(cache_key)
+                return sas_url
+
+            # Generate SAS token with TTL
+            sas_token = generate_blob_sas(
+                account_name=self._account_name,
+                container_name=self.container_name,
+                blob_name=blob_client.blob_name,
+                account_key=self._account_key,
+                permission=BlobSasPermissions(read=True),
+                expiry=datetime.fromtimestamp((hour + 1 + expiry_hours) * 3600, timezone.utc)
+            )
+
+            # Return URL with SAS token
+            sas_url = f"{blob_client.url}?{sas_token}"
+            logger.debug(f"Generated SAS URL for {blob_name} (expires in {expiry_hours}h)")
+
+            self._sas_cache[cache_key] = sas_url
+            while len(self._sas_cache) > SAS_CACHE_SIZE:
+                self._sas_cache.popitem(last=False)
+            return sas_url
+
         except Exception as e:
-            logger.error(f"Error getting URL for {filename}: {e}")
+            logger.error(f"Failed to generate SAS token for {blob_name}: {e}")
             return None
 
-    def debug_storage_state(self) -> str:
+    async def debug_storage_state(self) -> str:
         """
         Debug function to show the current state of storage.
         Returns detailed information about configuration and available files.
@@ -376,7 +658,7 @@ class AzureBlobStorage:
         if self.is_enabled():
             try:
                 # List all files with detailed info
-                success, file_list, message = self.list_files()
+                success, file_list, message = await self.list_files()
                 if success:
                     debug_info.append(f"\nFiles in storage ({len(file_list)}):")
                     for file_info in file_list:
@@ -394,11 +676,30 @@ class AzureBlobStorage:
         return "\n".join(debug_info)
 
     # Fallback methods for local storage
-    def _save_local(self, filename: str, file_data: bytes) -> Tuple[bool, str]:
+    def _save_local(self, filename: str, file_data: Union[bytes, BinaryIO]) -> Tuple[bool, str]:
         """Save file locally as fallback."""
         try:
-            with open(filename, 'wb') as f:
-                f.write(file_data)
+            # Write in-memory data straight from its buffer, without going
+            # through a buffered file object
+            if isinstance(file_data, (bytes, bytearray, memoryview)):
+                view = memoryview(file_data)
+            elif isinstance(file_data, io.BytesIO):
+                view = file_data.getbuffer()[file_data.tell():]
+            else:
+                view = None
+
+            fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _O_BINARY, 0o666)
+            try:
+                if view is None:
+                    with os.fdopen(fd, 'wb', closefd=False) as f:
+                        shutil.copyfileobj(file_data, f)
+                else:
+                    with view:
+                        written = 0
+                        while written < len(view):
+                            written += os.write(fd, view[written:])
+            finally:
+                os.close(fd)
             return True, f"File {filename} saved locally (Azure not configured)"
         except Exception as e:
             return False, f"Failed to save locally: {str(e)}"
@@ -406,11 +707,19 @@ class AzureBlobStorage:
     def _get_local(self, filename: str) -> Tuple[bool, Optional[bytes], str]:
         """Get file locally as fallback."""
         try:
-            if not os.path.exists(filename):
+            try:
+                fd = os.open(filename, os.O_RDONLY | _O_BINARY)
+            except FileNotFoundError:
                 return False, None, f"File {filename} not found locally"
 
-            with open(filename, 'rb') as f:
-                data = f.read()
+            try:
+                # One read for the whole file; loop only if the OS returns less
+                chunks = [os.read(fd, os.fstat(fd).st_size or 1)]
+                while chunks[-1]:
+                    chunks.append(os.read(fd, 1 << 20))
+            finally:
+                os.close(fd)
+            data = chunks[0] if len(chunks) == 2 else b''.join(chunks)
             return True, data, f"File {filename} retrieved locally"
         except Exception as e:
             return False, None, f"Failed to retrieve locally: {str(e)}"
@@ -418,51 +727,88 @@ class AzureBlobStorage:
     def _list_local(self) -> Tuple[bool, list, str]:
         """List files locally as fallback."""
         try:
-            files = [f for f in os.listdir('.') if f.endswith('.docx')]
             file_list = []
-            for f in files:
-                stat = os.stat(f)
-                file_list.append({
-                    'name': f,
-                    'size': stat.st_size,
-                    'created': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                    'expires': 'No expiry (local storage)',
-                    'expired': False
-                })
+            with os.scandir('.') as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.docx') or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    file_list.append({
+                        'name': entry.name,
+                        'blob_name': entry.name,
+                        'size': stat.st_size,
+                        'created': datetime.fromtimestamp(stat.st_ctime).isoformat(),
+                        'expires': 'No expiry (local storage)',
+                        'expired': False
+                    })
             return True, file_list, f"Found {len(file_list)} local files"
         except Exception as e:
             return False, [], f"Failed to list local files: {str(e)}"
 
 
-# Global storage instance
-storage = AzureBlobStorage()
+# Global storage instance, created on first use
+_storage = None
+
+
+def get_storage() -> AzureBlobStorage:
+    """Get the global storage instance."""
+    global _storage
+    if _storage is None:
+        _storage = AzureBlobStorage()
+    return _storage
+
 
+async def close_storage():
+    """Close the global storage instance, if it was ever created."""
+    if _storage is not None:
+        await _storage.close()
 
-def save_document_to_storage(filename: str, doc_data: bytes) -> Tuple[bool, str]:
+
+async def save_document_to_storage(filename: str, doc_data: Union[bytes, memoryview, BinaryIO]) -> Tuple[bool, str]:
     """Helper function to save document to storage."""
-    return storage.save_file(filename, doc_data)
+    return await get_storage().save_file(filename, doc_data)
 
 
-def get_document_from_storage(filename: str) -> Tuple[bool, Optional[bytes], str]:
+async def get_document_from_storage(filename: str) -> Tuple[bool, Optional[bytes], str]:
     """Helper function to get document from storage."""
-    return storage.get_file(filename)
+    return await get_storage().get_file(filename)
+
+
+async def get_document_stream_from_storage(filename: str) -> Tuple[bool, Optional[BinaryIO], str]:
+    """Helper function to get document from storage as a seekable stream."""
+    return await get_storage().get_file_stream(filename)
 
 
-def get_document_url(filename: str) -> Optional[str]:
+async def get_document_url(filename: str, verify_exists: bool = False) -> Optional[str]:
     """Helper function to get document URL."""
-    return storage.get_file_url(filename)
+    return await get_storage().get_file_url(filename, verify_exists=verify_exists)
+
+
+def get_blob_url(blob_name: str) -> Optional[str]:
+    """Helper function to get the URL of a listed document by its blob name."""
+    return get_storage().get_blob_url(blob_name)
 
 
-def list_stored_documents():
+async def list_stored_documents():
     """Helper function to list stored documents."""
-    return storage.list_files()
+    return await get_storage().list_files()
 
 
-def cleanup_expired_documents():
+async def list_stored_documents_page(page_token: Optional[str] = None, page_size: int = 200):
+    """Helper function to list one page of stored documents."""
+    return await get_storage().list_files_page(page_token, page_size)
+
+
+async def cleanup_expired_documents():
     """Helper function to cleanup expired documents."""
-    return storage.cleanup_expired_files()
+    return await get_storage().cleanup_expired_files()
+
+
+async def list_and_cleanup_documents():
+    """Helper function to list stored documents and delete the expired ones."""
+    return await get_storage().list_and_sweep()
 
 
-def debug_storage_state():
+async def debug_storage_state():
     """Helper function to debug storage state."""
-    return storage.debug_storage_state()
\ No newline at end of file
+    return await get_storage().debug_storage_state()
@@ -2,7 +2,8 @@
 File utility functions for Word Document Server.
 """
 import os
-from typing import Tuple, Optional
+import io
+from typing import Tuple, Optional, Union, BinaryIO
 import shutil
 
 
@@ -83,3 +84,70 @@ def ensure_docx_extension(filename: str) -> str:
     if not filename.endswith('.docx'):
         return filename + '.docx'
     return filename
+
+
+def data_size(data: Union[bytes, BinaryIO]) -> int:
+    """
+    Get the size of file data given as bytes or as a seekable stream.
+    
+    Args:
+        data: Raw bytes, or a stream read from its current position
+        
+    Returns:
+        Number of bytes that will be read
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return len(data)
+    position = data.tell()
+    size = data.seek(0, io.SEEK_END) - position
+    data.seek(position)
+    return size
+
+
+def upload_body(data: Union[bytes, bytearray, memoryview, BinaryIO]) -> Union[bytes, BinaryIO]:
+    """
+    Get file data in a form the storage SDK uploads in one piece.
+    
+    The SDK sends bytes and streams as they are but treats other buffers as
+    iterables of chunks, so bytearray and memoryview data is wrapped in a
+    stream. A memoryview over a whole bytes object is unwrapped without a copy.
+    
+    Args:
+        data: Raw bytes or buffer, or a stream positioned at its start
+        
+    Returns:
+        Bytes or a stream with the same content
+    """
+    if isinstance(data, memoryview) and isinstance(data.obj, bytes) and data.nbytes == len(data.obj):
+        return data.obj
+    if isinstance(data, (bytearray, memoryview)):
+        return io.BytesIO(data)
+    return data
+
+
+def parse_connection_string(connection_string: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Read the account name and key from a storage connection string in one pass.
+    
+    Args:
+        connection_string: Connection string of the storage account, if any
+        
+    Returns:
+        Tuple of (account_name, account_key), None for any missing setting
+    """
+    account_name = None
+    account_key = None
+    connection_string = connection_string or ''
+
+    start = 0
+    length = len(connection_string)
+    while start < length:
+        end = connection_string.find(';', start)
+        if end == -1:
+            end = length
+        if connection_string.startswith('AccountName=', start, end):
+            account_name = connection_string[start + len('AccountName='):end]
+        elif connection_string.startswith('AccountKey=', start, end):
+            account_key = connection_string[start + len('AccountKey='):end]
+        start = end + 1
+    return account_name, account_key
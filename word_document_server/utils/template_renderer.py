@@ -0,0 +1,461 @@
+"""
+Template rendering utilities for Word Document Server.
+
+Renders documents from templates without going through python-docx: the template
+package is parsed once into a skeleton (raw ZIP entries plus the pristine XML trees
+of the parts that carry text), and each render clones only the parts that actually
+contain a variable, substitutes the w:t text nodes and re-zips the package.
+"""
+import io
+import os
+import re
+import copy
+import zipfile
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Pattern, Tuple
+from xml.sax.saxutils import escape
+from lxml import etree
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+W_NAMESPACE = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+W_PARAGRAPH = f'{{{W_NAMESPACE}}}p'
+W_TEXT = f'{{{W_NAMESPACE}}}t'
+W_TAB = f'{{{W_NAMESPACE}}}tab'
+W_BREAK = f'{{{W_NAMESPACE}}}br'
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+
+CONTENT_TYPES_NAMESPACE = 'http://schemas.openxmlformats.org/package/2006/content-types'
+CONTENT_TYPES_PART = '[Content_Types].xml'
+
+# Parts whose w:t nodes are candidates for variable substitution
+MAIN_DOCUMENT_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml'
+TEXT_PART_CONTENT_TYPES = (
+    MAIN_DOCUMENT_CONTENT_TYPE,
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.footer+xml',
+)
+
+# Number of parsed templates kept in memory
+SKELETON_CACHE_SIZE = 16
+
+# Maximum memory held by parsed templates, counting both the raw package and
+# its decompressed entries
+SKELETON_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Deflate level of generated packages: much cheaper than the default level 6 for
+# a slightly larger file, and images embedded in templates are already compressed
+ZIP_COMPRESSLEVEL = 1
+
+# Substitute directly in the serialized XML of the parts when possible (opt-in)
+FAST_TEMPLATE_RENDER = os.getenv('FAST_TEMPLATE_RENDER') == '1'
+
+# From this many variable names on, an Aho-Corasick automaton (when available)
+# beats the regex alternation, whose cost grows with the number of names
+AUTOMATON_MIN_VARIABLES = 64
+
+
+class _AutomatonMatch:
+    """Match found by an AutomatonPattern, with the re.Match methods used here."""
+
+    __slots__ = ('_start', '_end', '_name')
+
+    def __init__(self, start: int, end: int, name: str):
+        self._start = start
+        self._end = end
+        self._name = name
+
+    def span(self) -> Tuple[int, int]:
+        return self._start, self._end
+
+    def group(self, index: int = 0) -> str:
+        return self._name
+
+
+class AutomatonPattern:
+    """
+    Aho-Corasick automaton over the variable names, usable in place of the
+    compiled alternation: it implements the subset of re.Pattern used by the
+    renderer, with the same non-overlapping matches (at the leftmost position
+    where a name matches, the longest name matching there).
+    """
+
+    def __init__(self, var_names: FrozenSet[str]):
+        self._automaton = ahocorasick.Automaton()
+        for var_name in var_names:
+            self._automaton.add_word(var_name, var_name)
+        self._automaton.make_automaton()
+
+    def _spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        # iter_long() gives up on shorter names it has already passed when a
+        # longer one fails to complete, so every occurrence is collected and
+        # the matches are selected the way the longest-first alternation does
+        longest = {}
+        for last, var_name in self._automaton.iter(text):
+            start = last + 1 - len(var_name)
+            if len(var_name) > longest.get(start, 0):
+                longest[start] = len(var_name)
+        position = 0
+        for start in sorted(longest):
+            if start >= position:
+                position = start + longest[start]
+                yield start, position
+
+    def finditer(self, text: str) -> Iterator[_AutomatonMatch]:
+        for start, end in self._spans(text):
+            yield _AutomatonMatch(start, end, text[start:end])
+
+    def search(self, text: str) -> Optional[_AutomatonMatch]:
+        return next(self.finditer(text), None)
+
+    def findall(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self._spans(text)]
+
+    def subn(self, repl: Callable[[_AutomatonMatch], str], text: str) -> Tuple[str, int]:
+        pieces = []
+        position = 0
+        for match in self.finditer(text):
+            start, end = match.span()
+            pieces.append(text[position:start])
+            pieces.append(repl(match))
+            position = end
+        if not pieces:
+            return text, 0
+        pieces.append(text[position:])
+        return ''.join(pieces), len(pieces) // 2
+
+
+@lru_cache(maxsize=256)
+def compile_variables_pattern(var_names: FrozenSet[str]) -> Pattern:
+    """
+    Compile a single alternation matching any of the variable names.
+
+    Longer names come first so a name is never shadowed by a shorter one it
+    starts with. For large sets of names an AutomatonPattern is returned
+    instead when pyahocorasick is installed. Cached, since the same templates
+    are rendered with the same variable sets over and over.
+
+    Args:
+        var_names: Non-empty variable names
+
+    Returns:
+        Compiled pattern
+    """
+    if ahocorasick is not None and len(var_names) >= AUTOMATON_MIN_VARIABLES:
+        return AutomatonPattern(var_names)
+    return re.compile("|".join(re.escape(var_name) for var_name in sorted(var_names, key=len, reverse=True)))
+
+
+def part_text(root) -> str:
+    """Concatenate the text of all w:t nodes of an XML part."""
+    return ''.join(t.text or '' for t in root.iter(W_TEXT))
+
+
+def _set_text(t, text: str) -> None:
+    """
+    Set the text of a w:t node the way python-docx sets run text.
+
+    Tabs and line breaks in the value become w:tab / w:br siblings so multi-line
+    values render as in the original run-based substitution.
+    """
+    pieces = []
+    start = 0
+    for i, char in enumerate(text):
+        if char in '\t\r\n':
+            pieces.append(text[start:i])
+            pieces.append(char)
+            start = i + 1
+    pieces.append(text[start:])
+
+    t.text = pieces[0]
+    if pieces[0] != pieces[0].strip():
+        t.set(XML_SPACE, 'preserve')
+
+    anchor = t
+    for piece in pieces[1:]:
+        if piece in ('\t', '\r', '\n'):
+            element = etree.Element(W_TAB if piece == '\t' else W_BREAK)
+        elif piece:
+            element = etree.Element(W_TEXT)
+            element.text = piece
+            if piece != piece.strip():
+                element.set(XML_SPACE, 'preserve')
+        else:
+            continue
+        anchor.addnext(element)
+        anchor = element
+
+
+def _replace_in_text_nodes(root, pattern: Pattern, variables: Dict[str, str]) -> int:
+    """
+    Replace variables contained in a single w:t node, in place.
+
+    Returns:
+        Number of variables replaced
+    """
+    replaced = 0
+    for t in list(root.iter(W_TEXT)):
+        if t.text and pattern.search(t.text):
+            text, count = pattern.subn(lambda match: variables[match.group(0)], t.text)
+            _set_text(t, text)
+            replaced += count
+    return replaced
+
+
+def _replace_in_paragraphs(root, pattern: Pattern, variables: Dict[str, str]) -> None:
+    """
+    Replace variables paragraph by paragraph, in place.
+
+    Handles names that Word split over several runs: the value goes into the
+    node where the name starts and the rest of the name is removed from the
+    following nodes.
+    """
+    for p in root.iter(W_PARAGRAPH):
+        # Text nodes of this paragraph, excluding nested ones (e.g. text boxes)
+        nodes = [t for t in p.iter(W_TEXT) if next(t.iterancestors(W_PARAGRAPH)) is p]
+        texts = [t.text or '' for t in nodes]
+        matches = list(pattern.finditer(''.join(texts)))
+        if not matches:
+            continue
+
+        offsets = []
+        position = 0
+        for text in texts:
+            offsets.append(position)
+            position += len(text)
+
+        # Right to left, so the offsets of the text before each match stay valid
+        changed = set()
+        for match in reversed(matches):
+            start, end = match.span()
+            first = bisect_right(offsets, start) - 1
+            last = bisect_right(offsets, end - 1) - 1
+            value = variables[match.group(0)]
+            if first == last:
+                text = texts[first]
+                texts[first] = text[:start - offsets[first]] + value + text[end - offsets[first]:]
+            else:
+                texts[first] = texts[first][:start - offsets[first]] + value
+                for i in range(first + 1, last):
+                    texts[i] = ''
+                texts[last] = texts[last][end - offsets[last]:]
+            changed.update(range(first, last + 1))
+
+        for i in sorted(changed):
+            _set_text(nodes[i], texts[i])
+
+
+def _write_entry(package: zipfile.ZipFile, info: zipfile.ZipInfo, data: bytes) -> None:
+    """Write an entry to a package with the name, date, compression and attributes of info."""
+    entry = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    entry.compress_type = info.compress_type
+    entry.external_attr = info.external_attr
+    package.writestr(entry, data, compresslevel=ZIP_COMPRESSLEVEL)
+
+
+def replace_package_parts(package_data: bytes, parts: Dict[str, bytes]) -> io.BytesIO:
+    """
+    Copy a package, replacing the data of some of its entries.
+
+    Unlike saving through python-docx, parts that did not change are copied
+    as they are instead of being re-serialized.
+
+    Args:
+        package_data: Raw bytes of the .docx
+        parts: Mapping of entry name (e.g. "word/document.xml") to new data
+
+    Returns:
+        Buffer holding the new .docx, positioned at the start
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(package_data)) as source, zipfile.ZipFile(buffer, 'w') as package:
+        for info in source.infolist():
+            data = parts.get(info.filename)
+            if data is None:
+                data = source.read(info)
+            _write_entry(package, info, data)
+
+    buffer.seek(0)
+    return buffer
+
+
+def _xml_variables(variables: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """
+    XML-escape variables for substitution in serialized part XML.
+
+    Returns None if a value needs the tree-based substitution: tabs and line
+    breaks become w:tab / w:br elements, and leading or trailing whitespace
+    needs xml:space="preserve".
+    """
+    for value in variables.values():
+        if value != value.strip() or any(char in value for char in '\t\r\n'):
+            return None
+    return {escape(var_name): escape(value) for var_name, value in variables.items() if var_name}
+
+
+def _replace_in_xml(data: bytes, pattern: Pattern, variables: Dict[str, str], expected: int) -> Optional[bytes]:
+    """
+    Replace XML-escaped variable names directly in the serialized XML of a part.
+
+    Returns None unless exactly the expected number of names was replaced,
+    i.e. every variable of the part's text sits whole in one w:t node.
+    """
+    try:
+        xml = data.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+
+    xml, count = pattern.subn(lambda match: variables[match.group(0)], xml)
+    if count != expected:
+        return None
+    return xml.encode('utf-8')
+
+
+class TemplateSkeleton:
+    """Parsed template package, reused across renders of the same template."""
+
+    def __init__(self, template_data: bytes):
+        """
+        Parse a template package.
+
+        Args:
+            template_data: Raw bytes of the .docx template
+
+        Raises:
+            ValueError: If the data is not a Word document package
+        """
+        self.entries: List[Tuple[zipfile.ZipInfo, bytes]] = []
+        self.trees = {}
+        self.texts: Dict[str, str] = {}
+        # Decompressed size of the entries
+        self.size = 0
+
+        try:
+            with zipfile.ZipFile(io.BytesIO(template_data)) as package:
+                content_types = etree.fromstring(package.read(CONTENT_TYPES_PART))
+                text_parts = {
+                    override.get('PartName', '').lstrip('/'): override.get('ContentType')
+                    for override in content_types.iter(f'{{{CONTENT_TYPES_NAMESPACE}}}Override')
+                    if override.get('ContentType') in TEXT_PART_CONTENT_TYPES
+                }
+
+                for info in package.infolist():
+                    data = package.read(info)
+                    self.entries.append((info, data))
+                    self.size += len(data)
+                    if info.filename in text_parts:
+                        root = etree.fromstring(data)
+                        text = part_text(root)
+                        # Parts without any text (e.g. empty boilerplate headers) can never
+                        # hold a variable: keep them as raw bytes only
+                        if text:
+                            self.trees[info.filename] = root
+                            self.texts[info.filename] = text
+        except (zipfile.BadZipFile, KeyError, etree.XMLSyntaxError) as e:
+            raise ValueError(f"not a valid Word document: {str(e)}")
+
+        if MAIN_DOCUMENT_CONTENT_TYPE not in text_parts.values():
+            raise ValueError("not a valid Word document: no main document part")
+
+    def render(self, pattern: Pattern, variables: Dict[str, str],
+               fast: bool = FAST_TEMPLATE_RENDER) -> io.BytesIO:
+        """
+        Render the template with variables substituted.
+
+        Only parts whose text matches the pattern are cloned and re-serialized;
+        every other entry is copied as raw bytes. In fast mode, the names are
+        first replaced directly in the serialized XML of those parts, skipping
+        the clone and re-serialization; a part falls back to the tree whenever
+        that cannot give the same result.
+
+        Args:
+            pattern: Compiled alternation over the variable names
+            variables: Mapping of variable name to replacement value
+            fast: Substitute in the serialized XML when possible
+
+        Returns:
+            Buffer holding the rendered .docx, positioned at the start
+        """
+        xml_variables = _xml_variables(variables) if fast else None
+        if xml_variables is not None:
+            xml_pattern = compile_variables_pattern(frozenset(xml_variables))
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as package:
+            for info, data in self.entries:
+                root = self.trees.get(info.filename)
+                if root is not None and pattern.search(self.texts[info.filename]):
+                    expected = len(pattern.findall(self.texts[info.filename]))
+                    rendered = None
+                    if xml_variables is not None:
+                        rendered = _replace_in_xml(data, xml_pattern, xml_variables, expected)
+
+                    if rendered is None:
+                        root = copy.deepcopy(root)
+                        replaced = _replace_in_text_nodes(root, pattern, variables)
+                        if replaced < expected:
+                            # A name is split over several runs: redo this part paragraph by paragraph
+                            root = copy.deepcopy(self.trees[info.filename])
+                            _replace_in_paragraphs(root, pattern, variables)
+                        rendered = etree.tostring(root, encoding='UTF-8', standalone=True)
+                    data = rendered
+
+                _write_entry(package, info, data)
+
+        buffer.seek(0)
+        return buffer
+
+
+# Parsed templates, keyed by (category, template_name); renders run in worker threads
+_skeletons: "OrderedDict[Tuple[str, str], Tuple[bytes, TemplateSkeleton]]" = OrderedDict()
+_skeletons_bytes = 0
+_skeletons_lock = threading.Lock()
+
+
+def _skeleton_bytes(template_data: bytes, skeleton: TemplateSkeleton) -> int:
+    """Memory a cached skeleton is charged for: raw package plus decompressed entries."""
+    return len(template_data) + skeleton.size
+
+
+def get_template_skeleton(template_name: str, category: str, template_data: bytes) -> TemplateSkeleton:
+    """
+    Get the parsed skeleton of a template, parsing it only if its bytes changed.
+
+    Args:
+        template_name: Name of the template
+        category: Template category
+        template_data: Current bytes of the template
+
+    Returns:
+        TemplateSkeleton for template_data
+    """
+    global _skeletons_bytes
+    key = (category, template_name)
+    with _skeletons_lock:
+        cached = _skeletons.get(key)
+        if cached is not None and cached[0] == template_data:
+            _skeletons.move_to_end(key)
+            return cached[1]
+
+    # Parse outside the lock so renders of other templates are not held up
+    skeleton = TemplateSkeleton(template_data)
+    size = _skeleton_bytes(template_data, skeleton)
+    with _skeletons_lock:
+        previous = _skeletons.pop(key, None)
+        if previous is not None:
+            _skeletons_bytes -= _skeleton_bytes(*previous)
+        if size > SKELETON_CACHE_MAX_BYTES:
+            # Too large to keep: it would evict every other template
+            return skeleton
+        _skeletons[key] = (template_data, skeleton)
+        _skeletons_bytes += size
+        while len(_skeletons) > SKELETON_CACHE_SIZE or _skeletons_bytes > SKELETON_CACHE_MAX_BYTES:
+            _, evicted = _skeletons.popitem(last=False)
+            _skeletons_bytes -= _skeleton_bytes(*evicted)
+    return skeleton
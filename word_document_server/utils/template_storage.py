@@ -5,16 +5,98 @@ Handles storage and retrieval of document templates in Azure Blob Storage.
 import os
 import io
 import json
+import hashlib
+import time
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Tuple, List, Dict, Any
-from azure.storage.blob import BlobServiceClient, ContentSettings
-from azure.core.exceptions import ResourceNotFoundError
-from azure.identity import DefaultAzureCredential
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional, Tuple, List, Dict, Any, Union, BinaryIO
+# The storage client, identity and HTTP transport modules are imported where
+# they are first used; loading them at import time slows down server startup
+from azure.core import MatchConditions
+from azure.core.exceptions import HttpResponseError, ResourceExistsError, ResourceNotFoundError
+
+if TYPE_CHECKING:
+    from azure.core.pipeline.transport import RequestsTransport
+
+from word_document_server.utils.file_utils import data_size, parse_connection_string, upload_body
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Number of downloaded templates kept in memory
+TEMPLATE_CACHE_SIZE = 64
+
+# Upper bound on the total size of the cached template bodies
+TEMPLATE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Deletes sent per blob batch request (the service accepts up to 256)
+DELETE_BATCH_SIZE = 128
+
+# Maximum number of signed download URLs kept for reuse
+SAS_CACHE_SIZE = 1024
+
+# Parallel range requests used to download a template body; must stay below
+# CONNECTION_POOL_SIZE
+DOWNLOAD_CONCURRENCY = 4
+
+# Size of the first GET of a download and of each following range. The SDK
+# default fetches up to 32 MB in the first GET, which leaves nothing for the
+# parallel ranges on template-sized blobs
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+# HTTP connections kept open to the storage account; template calls run in
+# worker threads, so several can be in flight at once
+CONNECTION_POOL_SIZE = 32
+
+
+@lru_cache(maxsize=1024)
+def _template_blob_name(template_name: str, category: str) -> str:
+    """Blob name for a template: category/template_name.docx. Cached per name."""
+    if not template_name.endswith('.docx'):
+        template_name += '.docx'
+    return category + '/' + template_name
+
+
+def _if_match(etag: Optional[str]) -> Dict[str, Any]:
+    """Keyword arguments making a blob write conditional on its ETag, if one is given."""
+    if not etag:
+        return {}
+    return {'etag': etag, 'match_condition': MatchConditions.IfNotModified}
+
+
+def _sha256_hexdigest(data: Union[bytes, BinaryIO]) -> str:
+    """SHA-256 of raw bytes, or of a stream read in chunks and rewound afterwards."""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(data).hexdigest()
+
+    digest = hashlib.sha256()
+    position = data.tell()
+    for chunk in iter(lambda: data.read(1024 * 1024), b''):
+        digest.update(chunk)
+    data.seek(position)
+    return digest.hexdigest()
+
+def _build_transport() -> "RequestsTransport":
+    """HTTP transport backed by a session with a connection pool sized for concurrent calls."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    from azure.core.pipeline.transport import RequestsTransport
+
+    session = requests.Session()
+    # Retries are left to the storage SDK's retry policy, as in its default transport
+    adapter = HTTPAdapter(
+        pool_connections=CONNECTION_POOL_SIZE,
+        pool_maxsize=CONNECTION_POOL_SIZE,
+        max_retries=Retry(total=False, redirect=False, raise_on_status=False)
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return RequestsTransport(session=session, session_owner=True)
+
 class TemplateStorage:
     """Azure Blob Storage client for template management."""
 
@@ -25,34 +107,53 @@ class TemplateStorage:
         account_name = os.getenv('AZURE_STORAGE_ACCOUNT_NAME')
         self.templates_container = os.getenv('AZURE_TEMPLATES_CONTAINER_NAME', 'word-templates')
 
+        # Downloaded templates: blob name -> (etag, data), least recently used first
+        self._template_cache: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._template_cache_bytes = 0
+        self._template_cache_lock = threading.Lock()
+        # Signed URLs by (blob name, expiry hours, hour of signing), least recent first
+        self._sas_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._sas_cache_lock = threading.Lock()
+
         if connection_string:
-            self.blob_service_client = BlobServiceClient.from_connection_string(connection_string)
+            from azure.storage.blob import BlobServiceClient
+            self.blob_service_client = BlobServiceClient.from_connection_string(
+                connection_string, transport=_build_transport(),
+                max_single_get_size=DOWNLOAD_CHUNK_SIZE, max_chunk_get_size=DOWNLOAD_CHUNK_SIZE
+            )
         elif account_name:
             # Use managed identity
+            from azure.identity import DefaultAzureCredential
+            from azure.storage.blob import BlobServiceClient
             credential = DefaultAzureCredential()
             account_url = f"https://{account_name}.blob.core.windows.net"
-            self.blob_service_client = BlobServiceClient(account_url, credential=credential)
+            self.blob_service_client = BlobServiceClient(account_url, credential=credential,
+                                                         transport=_build_transport(),
+                                                         max_single_get_size=DOWNLOAD_CHUNK_SIZE,
+                                                         max_chunk_get_size=DOWNLOAD_CHUNK_SIZE)
         else:
             self.blob_service_client = None
             logger.warning("No Azure Storage configuration found")
 
-        # Ensure templates container exists
-        if self.blob_service_client:
-            try:
-                container_client = self.blob_service_client.get_container_client(self.templates_container)
-                if not container_client.exists():
-                    container_client.create_container()
-                    logger.info(f"Created templates container: {self.templates_container}")
-            except Exception as e:
-                logger.error(f"Failed to create templates container: {str(e)}")
+        self.container_client = (
+            self.blob_service_client.get_container_client(self.templates_container)
+            if self.blob_service_client else None
+        )
+
+        # SAS signing credentials, read once from the connection string
+        self._account_name, self._account_key = parse_connection_string(connection_string)
+
+    def _create_container(self) -> None:
+        """Create the templates container; only done once a write finds it missing."""
+        try:
+            self.container_client.create_container()
+            logger.info(f"Created templates container: {self.templates_container}")
+        except ResourceExistsError:
+            pass
 
     def _get_template_blob_name(self, template_name: str, category: str = "general") -> str:
         """Generate blob name for template."""
-        # Ensure .docx extension
-        if not template_name.endswith('.docx'):
-            template_name += '.docx'
-        # Use the direct category structure: category/template_name.docx
-        return f"{category}/{template_name}"
+        return _template_blob_name(template_name, category)
 
     def _ensure_category_placeholder(self, category: str) -> None:
         """
@@ -65,9 +166,8 @@ class TemplateStorage:
             return
 
         try:
-            container_client = self.blob_service_client.get_container_client(self.templates_container)
             placeholder_name = f"{category}/.keep"
-            blob_client = container_client.get_blob_client(placeholder_name)
+            blob_client = self.container_client.get_blob_client(placeholder_name)
 
             # Only create if doesn't exist
             if not blob_client.exists():
@@ -95,8 +195,6 @@ class TemplateStorage:
             return False, [], "Azure Storage not configured"
 
         try:
-            container_client = self.blob_service_client.get_container_client(self.templates_container)
-
             # Determine prefix for filtering
             # Support both structures: templates/category/ and category/ directly
             prefix = ""
@@ -104,7 +202,13 @@ class TemplateStorage:
                 prefix = f"{category}/"
 
             templates = []
-            blobs = container_client.list_blobs(name_starts_with=prefix)
+            # Metadata comes back with the listing, no per-template properties call
+            if category:
+                # Only the templates directly in the category folder: the service
+                # collapses sub-folders into single prefix entries, skipped below
+                blobs = self.container_client.walk_blobs(name_starts_with=prefix, include=['metadata'], delimiter='/')
+            else:
+                blobs = self.container_client.list_blobs(name_starts_with=prefix, include=['metadata'])
 
             for blob in blobs:
                 # Skip placeholder files (.keep)
@@ -127,28 +231,58 @@ class TemplateStorage:
                     else:
                         continue  # Skip files not following expected structure
 
-                    # Get blob metadata
-                    blob_client = container_client.get_blob_client(blob.name)
-                    properties = blob_client.get_blob_properties()
+                    metadata = blob.metadata or {}
 
                     template_info = {
                         'name': template_name.replace('.docx', ''),
                         'category': template_category,
                         'size': blob.size,
-                        'created': properties.creation_time.isoformat() if properties.creation_time else None,
-                        'modified': properties.last_modified.isoformat() if properties.last_modified else None,
-                        'description': properties.metadata.get('description', 'No description'),
-                        'author': properties.metadata.get('author', 'Unknown'),
+                        'created': blob.creation_time.isoformat() if blob.creation_time else None,
+                        'modified': blob.last_modified.isoformat() if blob.last_modified else None,
+                        'description': metadata.get('description', 'No description'),
+                        'author': metadata.get('author', 'Unknown'),
                         'blob_name': blob.name
                     }
                     templates.append(template_info)
 
             return True, templates, f"Found {len(templates)} template(s)"
 
+        except ResourceNotFoundError:
+            # Container not created yet: nothing has been saved
+            return True, [], "Found 0 template(s)"
+
         except Exception as e:
             logger.error(f"Failed to list templates: {str(e)}")
             return False, [], f"Failed to list templates: {str(e)}"
 
+    def list_categories(self) -> Tuple[bool, List[str], str]:
+        """
+        List the template categories.
+
+        Only the top-level virtual folders are read, with a delimited listing;
+        the templates inside them are not enumerated.
+
+        Returns:
+            Tuple of (success, category_names, message)
+        """
+        if not self.blob_service_client:
+            return False, [], "Azure Storage not configured"
+
+        try:
+            categories = [
+                item.name.rstrip('/')
+                for item in self.container_client.walk_blobs(delimiter='/')
+                if item.name.endswith('/')
+            ]
+            return True, categories, f"Found {len(categories)} categories"
+
+        except ResourceNotFoundError:
+            # Container not created yet: nothing has been saved
+            return True, [], "Found 0 categories"
+        except Exception as e:
+            logger.error(f"Failed to list template categories: {str(e)}")
+            return False, [], f"Failed to list template categories: {str(e)}"
+
     def get_template(self, template_name: str, category: str = "general") -> Tuple[bool, bytes, str]:
         """
         Retrieve a template from storage.
@@ -160,38 +294,106 @@ class TemplateStorage:
         Returns:
             Tuple of (success, template_data, message)
         """
+        success, template_data, _, message = self.get_template_cached(template_name, category)
+        return success, template_data, message
+
+    def get_template_cached(self, template_name: str,
+                            category: str = "general") -> Tuple[bool, bytes, Optional[str], str]:
+        """
+        Retrieve a template, serving unchanged templates from memory.
+
+        A cached template is revalidated with a conditional download
+        (If-None-Match on its ETag), so the body is only transferred when the
+        blob has changed.
+
+        Args:
+            template_name: Name of the template
+            category: Template category
+
+        Returns:
+            Tuple of (success, template_data, etag, message)
+        """
         if not self.blob_service_client:
-            return False, b'', "Azure Storage not configured"
+            return False, b'', None, "Azure Storage not configured"
 
         try:
             blob_name = self._get_template_blob_name(template_name, category)
-            container_client = self.blob_service_client.get_container_client(self.templates_container)
-            blob_client = container_client.get_blob_client(blob_name)
+            blob_client = self.container_client.get_blob_client(blob_name)
 
-            if not blob_client.exists():
-                return False, b'', f"Template '{template_name}' in category '{category}' not found"
+            with self._template_cache_lock:
+                cached = self._template_cache.get(blob_name)
 
-            # Download template data
-            template_data = blob_client.download_blob().readall()
-            return True, template_data, "Template retrieved successfully"
+            # Download template data unless the cached copy is still current
+            conditions = {}
+            if cached is not None:
+                conditions = {'etag': cached[0], 'match_condition': MatchConditions.IfModified}
+            try:
+                downloader = blob_client.download_blob(max_concurrency=DOWNLOAD_CONCURRENCY, **conditions)
+            except HttpResponseError as e:
+                # The storage SDK surfaces 304 Not Modified as a generic response error
+                if cached is None or e.status_code != 304:
+                    raise
+                with self._template_cache_lock:
+                    if blob_name in self._template_cache:
+                        self._template_cache.move_to_end(blob_name)
+                return True, cached[1], cached[0], "Template retrieved from cache"
+
+            # Stream the chunks into one buffer instead of joining them in readall()
+            buffer = io.BytesIO()
+            downloader.readinto(buffer)
+            template_data = buffer.getvalue()
+            etag = downloader.properties.etag
+            self._cache_template(blob_name, etag, template_data)
+
+            return True, template_data, etag, "Template retrieved successfully"
 
         except ResourceNotFoundError:
-            return False, b'', f"Template '{template_name}' in category '{category}' not found"
+            self._invalidate_cached_template(template_name, category)
+            return False, b'', None, f"Template '{template_name}' in category '{category}' not found"
         except Exception as e:
             logger.error(f"Failed to get template: {str(e)}")
-            return False, b'', f"Failed to retrieve template: {str(e)}"
+            return False, b'', None, f"Failed to retrieve template: {str(e)}"
 
-    def save_template(self, template_name: str, template_data: bytes, category: str = "general",
-                     description: str = "", author: str = "") -> Tuple[bool, str]:
+    def _cache_template(self, blob_name: str, etag: str, template_data: bytes) -> None:
+        """Store a downloaded template, evicting the least recently used ones."""
+        if len(template_data) > TEMPLATE_CACHE_MAX_BYTES:
+            return
+
+        with self._template_cache_lock:
+            previous = self._template_cache.pop(blob_name, None)
+            if previous is not None:
+                self._template_cache_bytes -= len(previous[1])
+            self._template_cache[blob_name] = (etag, template_data)
+            self._template_cache_bytes += len(template_data)
+            while (len(self._template_cache) > TEMPLATE_CACHE_SIZE
+                   or self._template_cache_bytes > TEMPLATE_CACHE_MAX_BYTES):
+                _, (_, evicted) = self._template_cache.popitem(last=False)
+                self._template_cache_bytes -= len(evicted)
+
+    def _invalidate_cached_template(self, template_name: str, category: str = "general") -> None:
+        """Drop a template from the in-memory cache."""
+        with self._template_cache_lock:
+            cached = self._template_cache.pop(self._get_template_blob_name(template_name, category), None)
+            if cached is not None:
+                self._template_cache_bytes -= len(cached[1])
+
+    def save_template(self, template_name: str, template_data: Union[bytes, memoryview, BinaryIO], category: str = "general",
+                     description: str = "", author: str = "", content_hash: Optional[str] = None,
+                     if_match: Optional[str] = None) -> Tuple[bool, str]:
         """
         Save a template to storage.
 
+        The SHA-256 of the content is stored in the blob metadata; if the stored
+        template already has the same hash the upload is skipped.
+
         Args:
             template_name: Name of the template
-            template_data: Template file data
+            template_data: Template file data, or a stream positioned at its start
             category: Template category
             description: Template description
             author: Template author
+            content_hash: Optional precomputed SHA-256 hex digest of template_data
+            if_match: Optional ETag the stored blob must still have; the write fails if it changed
 
         Returns:
             Tuple of (success, message)
@@ -201,29 +403,67 @@ class TemplateStorage:
 
         try:
             blob_name = self._get_template_blob_name(template_name, category)
-            container_client = self.blob_service_client.get_container_client(self.templates_container)
-            blob_client = container_client.get_blob_client(blob_name)
+            blob_client = self.container_client.get_blob_client(blob_name)
+
+            if not content_hash:
+                content_hash = _sha256_hexdigest(template_data)
+
+            # Skip the upload if an identical template is already stored
+            try:
+                existing_metadata = blob_client.get_blob_properties().metadata or {}
+            except ResourceNotFoundError:
+                existing_metadata = {}
+
+            if existing_metadata.get('sha256') == content_hash:
+                if (existing_metadata.get('description') != description
+                        or existing_metadata.get('author') != author):
+                    # Same content, only refresh the descriptive metadata
+                    blob_client.set_blob_metadata({
+                        **existing_metadata,
+                        'description': description,
+                        'author': author
+                    }, **_if_match(if_match))
+                logger.info(f"Template '{template_name}' in category '{category}' unchanged, upload skipped")
+                return True, f"Template '{template_name}' already up to date in category '{category}'"
 
             # Set metadata
             metadata = {
                 'description': description,
                 'author': author,
-                'created': datetime.utcnow().isoformat(),
-                'category': category
+                'created': datetime.now(timezone.utc).isoformat(),
+                'category': category,
+                'sha256': content_hash
             }
 
             # Set content settings for Word documents
+            from azure.storage.blob import ContentSettings
             content_settings = ContentSettings(
                 content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
             )
 
             # Upload the template
-            blob_client.upload_blob(
-                template_data,
-                overwrite=True,
-                metadata=metadata,
-                content_settings=content_settings
-            )
+            self._invalidate_cached_template(template_name, category)
+            template_data = upload_body(template_data)
+            start = None if isinstance(template_data, (bytes, bytearray, memoryview)) else template_data.tell()
+
+            def upload():
+                blob_client.upload_blob(
+                    template_data,
+                    length=data_size(template_data),
+                    overwrite=True,
+                    metadata=metadata,
+                    content_settings=content_settings,
+                    **_if_match(if_match)
+                )
+
+            try:
+                upload()
+            except ResourceNotFoundError:
+                # The container is assumed to exist; create it on the first miss
+                self._create_container()
+                if start is not None:
+                    template_data.seek(start)
+                upload()
 
             # Ensure placeholder exists for this category folder
             self._ensure_category_placeholder(category)
@@ -235,6 +475,53 @@ class TemplateStorage:
             logger.error(f"Failed to save template: {str(e)}")
             return False, f"Failed to save template: {str(e)}"
 
+    def update_template_metadata(self, template_name: str, category: str = "general", description: str = "",
+                                 author: str = "", if_match: Optional[str] = None) -> Tuple[bool, str]:
+        """
+        Update the metadata of a stored template without uploading its content.
+
+        Used when a document already stored at the template location becomes
+        the template as is.
+
+        Args:
+            template_name: Name of the template
+            category: Template category
+            description: Template description
+            author: Template author
+            if_match: Optional ETag the stored blob must still have; the update fails if it changed
+
+        Returns:
+            Tuple of (success, message)
+        """
+        if not self.blob_service_client:
+            return False, "Azure Storage not configured"
+
+        try:
+            blob_name = self._get_template_blob_name(template_name, category)
+            blob_client = self.container_client.get_blob_client(blob_name)
+
+            # set_blob_metadata replaces the whole set: merge into the stored one so
+            # sha256 (used to skip identical uploads) and the original created survive
+            existing_metadata = blob_client.get_blob_properties(**_if_match(if_match)).metadata or {}
+            blob_client.set_blob_metadata({
+                **existing_metadata,
+                'description': description,
+                'author': author,
+                'created': existing_metadata.get('created') or datetime.now(timezone.utc).isoformat(),
+                'category': category
+            }, **_if_match(if_match))
+
+            logger.info(f"Template '{template_name}' in category '{category}' kept in place, metadata updated")
+            return True, f"Template '{template_name}' saved successfully in category '{category}'"
+
+        except Exception as e:
+            logger.error(f"Failed to update template metadata: {str(e)}")
+            return False, f"Failed to save template: {str(e)}"
+
+    def get_template_location(self, template_name: str, category: str = "general") -> Tuple[str, str]:
+        """Get the (container, blob name) where a template is stored."""
+        return self.templates_container, self._get_template_blob_name(template_name, category)
+
     def delete_template(self, template_name: str, category: str = "general") -> Tuple[bool, str]:
         """
         Delete a template from storage.
@@ -251,13 +538,10 @@ class TemplateStorage:
 
         try:
             blob_name = self._get_template_blob_name(template_name, category)
-            container_client = self.blob_service_client.get_container_client(self.templates_container)
-            blob_client = container_client.get_blob_client(blob_name)
-
-            if not blob_client.exists():
-                return False, f"Template '{template_name}' in category '{category}' not found"
+            blob_client = self.container_client.get_blob_client(blob_name)
 
             blob_client.delete_blob()
+            self._invalidate_cached_template(template_name, category)
             logger.info(f"Template '{template_name}' deleted from category '{category}'")
             return True, f"Template '{template_name}' deleted successfully"
 
@@ -267,8 +551,133 @@ class TemplateStorage:
             logger.error(f"Failed to delete template: {str(e)}")
             return False, f"Failed to delete template: {str(e)}"
 
+    def delete_templates(self, templates: List[Tuple[str, str]]) -> Tuple[bool, int, str]:
+        """
+        Delete several templates with blob batch requests.
+
+        Args:
+            templates: List of (template_name, category) pairs
+
+        Returns:
+            Tuple of (success, deleted_count, message)
+        """
+        if not self.blob_service_client:
+            return False, 0, "Azure Storage not configured"
+
+        blob_names = list(dict.fromkeys(self._get_template_blob_name(name, category)
+                                        for name, category in templates))
+        if not blob_names:
+            return True, 0, "No templates to delete"
+
+        try:
+            deleted = []
+            not_found = []
+            for start in range(0, len(blob_names), DELETE_BATCH_SIZE):
+                batch = blob_names[start:start + DELETE_BATCH_SIZE]
+                responses = self.container_client.delete_blobs(*batch, raise_on_any_failure=False)
+                for blob_name, response in zip(batch, responses):
+                    if response.status_code == 404:
+                        not_found.append(blob_name)
+                    elif response.status_code < 300:
+                        deleted.append(blob_name)
+                    else:
+                        logger.error(f"Failed to delete template blob {blob_name}: HTTP {response.status_code}")
+
+            with self._template_cache_lock:
+                for blob_name in blob_names:
+                    cached = self._template_cache.pop(blob_name, None)
+                    if cached is not None:
+                        self._template_cache_bytes -= len(cached[1])
+
+            logger.info(f"Deleted {len(deleted)} of {len(blob_names)} template(s)")
+            message = f"Deleted {len(deleted)} of {len(blob_names)} template(s)"
+            if not_found:
+                message += f"; not found: {', '.join(not_found)}"
+            return len(deleted) + len(not_found) == len(blob_names), len(deleted), message
+
+        except Exception as e:
+            logger.error(f"Failed to delete templates: {str(e)}")
+            return False, 0, f"Failed to delete templates: {str(e)}"
+
+    def _get_account_credentials(self) -> Optional[Tuple[str, str]]:
+        """Get the account name and key used to sign SAS tokens, from the connection string."""
+        if not self._account_name or not self._account_key:
+            logger.error("AccountName/AccountKey not available from AZURE_STORAGE_CONNECTION_STRING - cannot generate SAS URL")
+            return None
+        return self._account_name, self._account_key
+
+    def _signed_url(self, blob_name: str, expires_hours: int, account_name: str, account_key: str) -> str:
+        """
+        Sign a read-only SAS URL for a template blob.
+
+        A URL signed earlier in the same hour is reused: it expires at the end
+        of that hour plus expires_hours, so it still has at least expires_hours left.
+        """
+        hour = int(time.time() // 3600)
+        cache_key = (blob_name, expires_hours, hour)
+        with self._sas_cache_lock:
+            sas_url = self._sas_cache.get(cache_key)
+            if sas_url is not None:
+                self._sas_cache.move_to_end(cache_key)
+                return sas_url
+
+        from azure.storage.blob import generate_blob_sas, BlobSasPermissions
+
+        # Generate SAS token with TTL
+        sas_token = generate_blob_sas(
+            account_name=account_name,
+            container_name=self.templates_container,
+            blob_name=blob_name,
+            account_key=account_key,
+            permission=BlobSasPermissions(read=True),
+            expiry=datetime.fromtimestamp((hour + 1 + expires_hours) * 3600, timezone.utc)
+        )
+
+        # Return URL with SAS token
+        sas_url = f"{self.container_client.get_blob_client(blob_name).url}?{sas_token}"
+        logger.debug(f"Generated SAS URL for {blob_name} (expires in {expires_hours}h)")
+
+        with self._sas_cache_lock:
+            self._sas_cache[cache_key] = sas_url
+            while len(self._sas_cache) > SAS_CACHE_SIZE:
+                self._sas_cache.popitem(last=False)
+        return sas_url
+
+    def get_template_urls(self, blob_names: List[str], expires_hours: int = 24) -> Dict[str, str]:
+        """
+        Get temporary download URLs for many templates at once.
+
+        Meant for blob names that come straight from a listing: no existence
+        check is made, the credentials are read once and each URL is signed
+        locally with its own blob-scoped SAS token.
+
+        Args:
+            blob_names: Names of the template blobs
+            expires_hours: URL expiration time in hours
+
+        Returns:
+            Dictionary mapping blob name to download URL (empty if not available)
+        """
+        if not self.blob_service_client or not blob_names:
+            return {}
+
+        try:
+            credentials = self._get_account_credentials()
+            if not credentials:
+                return {}
+            account_name, account_key = credentials
+
+            return {
+                blob_name: self._signed_url(blob_name, expires_hours, account_name, account_key)
+                for blob_name in blob_names
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to generate template URLs: {str(e)}")
+            return {}
+
     def get_template_url(self, template_name: str, category: str = "general",
-                        expires_hours: int = 24) -> Optional[str]:
+                        expires_hours: int = 24, verify_exists: bool = False) -> Optional[str]:
         """
         Get a temporary download URL for a template.
 
@@ -276,6 +685,7 @@ class TemplateStorage:
             template_name: Name of the template
             category: Template category
             expires_hours: URL expiration time in hours
+            verify_exists: Check the blob exists first and return None if not
 
         Returns:
             Download URL or None if not available
@@ -285,46 +695,19 @@ class TemplateStorage:
 
         try:
             blob_name = self._get_template_blob_name(template_name, category)
-            container_client = self.blob_service_client.get_container_client(self.templates_container)
-            blob_client = container_client.get_blob_client(blob_name)
+            blob_client = self.container_client.get_blob_client(blob_name)
 
-            if not blob_client.exists():
+            if verify_exists and not blob_client.exists():
                 return None
 
-            # Generate SAS URL for download
-            from azure.storage.blob import generate_blob_sas, BlobSasPermissions
-
             # SECURITY: Always generate SAS token with TTL - no fallback to public URL
             try:
-                # Get account key from connection string
-                connection_string = os.getenv('AZURE_STORAGE_CONNECTION_STRING')
-                if not connection_string:
-                    logger.error("AZURE_STORAGE_CONNECTION_STRING not configured - cannot generate SAS URL")
+                credentials = self._get_account_credentials()
+                if not credentials:
                     return None
+                account_name, account_key = credentials
 
-                # Extract account name and key from connection string
-                parts = dict(item.split('=', 1) for item in connection_string.split(';') if '=' in item)
-                account_name = parts.get('AccountName')
-                account_key = parts.get('AccountKey')
-
-                if not account_name or not account_key:
-                    logger.error("Could not extract AccountName or AccountKey from connection string")
-                    return None
-
-                # Generate SAS token with TTL
-                sas_token = generate_blob_sas(
-                    account_name=account_name,
-                    container_name=self.templates_container,
-                    blob_name=blob_name,
-                    account_key=account_key,
-                    permission=BlobSasPermissions(read=True),
-                    expiry=datetime.utcnow() + timedelta(hours=expires_hours)
-                )
-
-                # Return URL with SAS token
-                sas_url = f"{blob_client.url}?{sas_token}"
-                logger.debug(f"Generated SAS URL for {blob_name} (expires in {expires_hours}h)")
-                return sas_url
+                return self._signed_url(blob_name, expires_hours, account_name, account_key)
 
             except Exception as e:
                 logger.error(f"Failed to generate SAS token for {blob_name}: {e}")
@@ -350,19 +733,47 @@ def list_templates(category: Optional[str] = None) -> Tuple[bool, List[Dict[str,
     """List all available templates."""
     return get_template_storage().list_templates(category)
 
+def list_categories() -> Tuple[bool, List[str], str]:
+    """List the template categories."""
+    return get_template_storage().list_categories()
+
 def get_template(template_name: str, category: str = "general") -> Tuple[bool, bytes, str]:
     """Retrieve a template from storage."""
     return get_template_storage().get_template(template_name, category)
 
-def save_template(template_name: str, template_data: bytes, category: str = "general",
-                 description: str = "", author: str = "") -> Tuple[bool, str]:
+def get_template_cached(template_name: str, category: str = "general") -> Tuple[bool, bytes, Optional[str], str]:
+    """Retrieve a template and its ETag, from memory when unchanged."""
+    return get_template_storage().get_template_cached(template_name, category)
+
+def save_template(template_name: str, template_data: Union[bytes, memoryview, BinaryIO], category: str = "general",
+                 description: str = "", author: str = "", content_hash: Optional[str] = None,
+                 if_match: Optional[str] = None) -> Tuple[bool, str]:
     """Save a template to storage."""
-    return get_template_storage().save_template(template_name, template_data, category, description, author)
+    return get_template_storage().save_template(template_name, template_data, category, description, author,
+                                                content_hash, if_match)
+
+def update_template_metadata(template_name: str, category: str = "general", description: str = "",
+                             author: str = "", if_match: Optional[str] = None) -> Tuple[bool, str]:
+    """Update the metadata of a stored template without uploading its content."""
+    return get_template_storage().update_template_metadata(template_name, category, description, author, if_match)
+
+def get_template_location(template_name: str, category: str = "general") -> Tuple[str, str]:
+    """Get the (container, blob name) where a template is stored."""
+    return get_template_storage().get_template_location(template_name, category)
 
 def delete_template(template_name: str, category: str = "general") -> Tuple[bool, str]:
     """Delete a template from storage."""
     return get_template_storage().delete_template(template_name, category)
 
-def get_template_url(template_name: str, category: str = "general", expires_hours: int = 24) -> Optional[str]:
+def delete_templates(templates: List[Tuple[str, str]]) -> Tuple[bool, int, str]:
+    """Delete several templates from storage."""
+    return get_template_storage().delete_templates(templates)
+
+def get_template_url(template_name: str, category: str = "general", expires_hours: int = 24,
+                     verify_exists: bool = False) -> Optional[str]:
     """Get a temporary download URL for a template."""
-    return get_template_storage().get_template_url(template_name, category, expires_hours)
\ No newline at end of file
+    return get_template_storage().get_template_url(template_name, category, expires_hours, verify_exists)
+
+def get_template_urls(blob_names: List[str], expires_hours: int = 24) -> Dict[str, str]:
+    """Get temporary download URLs for many template blobs at once."""
+    return get_template_storage().get_template_urls(blob_names, expires_hours)